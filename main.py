@@ -25,9 +25,14 @@ from starlette.middleware.base import BaseHTTPMiddleware
 
 from src.api.routes import router
 from src.api.admin import admin_router
-from src.core.executor import init_process_pool, shutdown_process_pool
+from src.core.executor import (
+    init_process_pool,
+    shutdown_process_pool,
+    warmup_process_pool,
+)
 from src.core.state import state
 from src.core.turnstile import close_turnstile_client, get_turnstile_config
+from src.core.webhook import close_webhook_client
 from src.core.useragent import validate_user_agent
 
 logger = logging.getLogger(__name__)
@@ -99,8 +104,9 @@ async def lifespan(app: FastAPI):
     loop_type = type(loop).__name__
     logger.info("Event loop: %s", loop_type)
 
-    # 初始化进程池
+    # 初始化并预热进程池
     init_process_pool()
+    await warmup_process_pool()
 
     # 加载持久化黑名单
     state.load_blacklist()
@@ -130,16 +136,18 @@ async def lifespan(app: FastAPI):
     yield
 
     # 关闭
-    if state.timeout_task and not state.timeout_task.done():
-        state.timeout_task.cancel()
-        logger.info("Timeout checker stopped")
+    await state.stop_timeout_checker()
+    logger.info("Timeout checker stopped")
     await state.stop_hashrate_aggregation()
     logger.info("Hashrate aggregation stopped")
     await state.stop_token_cleanup()
     logger.info("Session token cleanup stopped")
+    await state.stop_writers()
+    logger.info("Connection writer tasks stopped")
 
-    # 关闭 Turnstile HTTP 客户端
+    # 关闭 Turnstile / Webhook HTTP 客户端
     await close_turnstile_client()
+    await close_webhook_client()
 
     # 关闭进程池
     shutdown_process_pool(wait=True)
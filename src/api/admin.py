@@ -8,10 +8,10 @@ from pathlib import Path
 from typing import Optional
 
 import aiofiles
-from argon2 import PasswordHasher, Type
 from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect
 
 from src.core.admin_auth import require_admin
+from src.core.executor import argon2_concurrency_limit
 from src.core.state import state
 from src.models.schemas import (
     AdminArgon2Update,
@@ -310,33 +310,27 @@ async def update_argon2(
     body: AdminArgon2Update,
     _: str = Depends(require_admin),
 ):
-    """修改 Argon2 参数（重建 PasswordHasher）"""
-    if body.time_cost is not None:
-        if body.time_cost < 1:
-            return {"error": "time_cost must be >= 1"}
-        state.argon2_time_cost = body.time_cost
-
-    if body.memory_cost is not None:
-        if body.memory_cost < 8:
-            return {"error": "memory_cost must be >= 8 KB"}
-        state.argon2_memory_cost = body.memory_cost
-
-    if body.parallelism is not None:
-        if body.parallelism < 1:
-            return {"error": "parallelism must be >= 1"}
-        state.argon2_parallelism = body.parallelism
-
-    # 重建 PasswordHasher
-    state.ph = PasswordHasher(
-        time_cost=state.argon2_time_cost,
-        memory_cost=state.argon2_memory_cost,
-        parallelism=state.argon2_parallelism,
-        hash_len=32,
-        type=Type.D,
+    """修改 Argon2 参数（下一次验证起生效）"""
+    # 先校验全部字段，避免部分参数已生效后才返回错误
+    if body.time_cost is not None and body.time_cost < 1:
+        return {"error": "time_cost must be >= 1"}
+    if body.memory_cost is not None and body.memory_cost < 8:
+        return {"error": "memory_cost must be >= 8 KB"}
+    if body.parallelism is not None and body.parallelism < 1:
+        return {"error": "parallelism must be >= 1"}
+
+    # 并发上限需读取 sysfs / cgroup 文件，在锁外的线程中预先计算
+    concurrency = await asyncio.to_thread(
+        argon2_concurrency_limit,
+        body.memory_cost if body.memory_cost is not None else state.argon2_memory_cost,
+        body.parallelism if body.parallelism is not None else state.argon2_parallelism,
     )
 
-    # 修改参数后立刻重置题目
+    # 参数更新与题目重置在同一锁内完成
     async with state.lock:
+        state.update_argon2(
+            body.time_cost, body.memory_cost, body.parallelism, concurrency=concurrency
+        )
         await state.close_timeout_window()
         state.reset_puzzle()
         reset_msg = state.get_puzzle_reset_message()
@@ -425,7 +419,7 @@ async def kick_all(_: str = Depends(require_admin)):
     revoked = state.revoke_all_tokens()
 
     # 2. 再关闭 WebSocket（此时前端重连会被 validate 拒绝）
-    connections = list(state.active_connections)
+    connections = state.active_connections_view()
     count = len(connections)
 
     for ws in connections:
@@ -434,10 +428,8 @@ async def kick_all(_: str = Depends(require_admin)):
         except Exception:
             pass
 
-    state.active_connections.clear()
+    state.clear_connections()
     state.active_miners.clear()
-    state.client_hashrates.clear()
-    state.overspeed_hashrates.clear()
     state.ip_connections.clear()
 
     # 3. 重置谜题与计时状态，避免在连接被批量清空后留下半旧状态。
@@ -472,14 +464,11 @@ async def kick_ip(
     state.ban_ip(target_ip)
     await state.save_blacklist()
 
-    # 1. 吊销该 IP 的所有 Token（阻止前端重连时通过 validate 校验）
-    revoked = state.revoke_tokens_by_ip(target_ip)
+    # 1. 收集需要踢出的 WebSocket 连接（吊销前经 Token 反向索引查找，不遍历全部连接）
+    to_kick = state.get_ip_websockets(target_ip)
 
-    # 2. 收集需要踢出的 WebSocket 连接（一次遍历）
-    to_kick = [
-        ws for ws, data in list(state.client_hashrates.items())
-        if data.get("ip") == target_ip
-    ]
+    # 2. 吊销该 IP 的所有 Token（阻止前端重连时通过 validate 校验）
+    revoked = state.revoke_tokens_by_ip(target_ip)
 
     # 3. 关闭 WebSocket 连接
     kicked = 0
@@ -520,12 +509,8 @@ async def get_blacklist(_: str = Depends(require_admin)):
 @admin_router.post("/clear-sessions")
 async def clear_sessions(_: str = Depends(require_admin)):
     """清空所有 Session Token 并断开关联的 WebSocket 连接"""
-    # 1. 先收集仍有连接的 WebSocket
-    to_close = []
-    for token_str, data in state.session_tokens.items():
-        ws = data.get("websocket")
-        if ws and data.get("is_connected"):
-            to_close.append(ws)
+    # 1. 先取仍有连接的 WebSocket 快照（吊销会清空索引，关闭时不再遍历共享容器）
+    to_close = state.session_websockets_view()
 
     # 2. 吊销所有 Token（阻止前端重连时通过 validate 校验）
     revoked = state.revoke_all_tokens()
@@ -584,21 +569,20 @@ async def admin_ws(websocket: WebSocket):
         return
 
     await websocket.accept()
-    state.admin_connections.add(websocket)
+    state.add_admin_connection(websocket)
     logger.info("Admin WebSocket connected (total: %d)", len(state.admin_connections))
 
     try:
         while True:
-            # 每 2 秒推送状态
-            snapshot = state.get_status_snapshot()
-            network = state.get_network_hashrate()
-            snapshot["total_hashrate"] = round(network["total_hashrate"], 2)
-            await websocket.send_json({"type": "STATUS_UPDATE", **snapshot})
+            # 每 2 秒推送状态（多个 Admin 连接共享同一份序列化快照），
+            # 经该连接的写协程发送；写失败或过慢而被移除时结束循环
+            if not state.send_event_to_connection(websocket, state.get_status_update_event()):
+                break
             await asyncio.sleep(2)
     except WebSocketDisconnect:
         pass
     except Exception:
         pass
     finally:
-        state.admin_connections.discard(websocket)
+        state.remove_admin_connection(websocket)
         logger.info("Admin WebSocket disconnected (total: %d)", len(state.admin_connections))
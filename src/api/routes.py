@@ -14,11 +14,11 @@ from fastapi import (
     WebSocket,
     WebSocketDisconnect,
 )
-from fastapi.responses import PlainTextResponse
+from fastapi.responses import PlainTextResponse, Response
 
 from src.core.audit import append_to_verify_log
-from src.core.crypto import generate_invite_code, verify_argon2_solution
-from src.core.executor import get_process_pool
+from src.core.crypto import generate_invite_code
+from src.core.jsonutil import json_dumps, json_loads
 from src.core.state import state
 from src.core.turnstile import (
     get_turnstile_config,
@@ -80,24 +80,20 @@ async def verify_session_token(
         raise HTTPException(status_code=403, detail="Access denied")
 
     # 6. 验证 Token 是否存在
-    if token not in state.session_tokens:
+    token_data = state.session_tokens.get(token)
+    if token_data is None:
         raise HTTPException(status_code=401, detail="Invalid or expired session token")
 
-    token_data = state.session_tokens[token]
-
     # 7. 验证 IP 一致性（关键：IP 变化检测）
-    if token_data["ip"] != real_ip:
+    if token_data.ip != real_ip:
         logger.warning(
             "IP mismatch for token %s: stored=%s, current=%s - revoking token",
             token[:8],
-            token_data["ip"],
+            token_data.ip,
             real_ip,
         )
         # 立即撤销 Token（防止 IP 变化后继续使用）
-        token_data["revoked"] = True
-        token_data["is_connected"] = False
-        token_data["disconnected_at"] = time.time()
-        token_data["websocket"] = None
+        state.revoke_token(token, token_data)
         raise HTTPException(
             status_code=403, detail="IP changed, session token revoked"
         )
@@ -128,11 +124,11 @@ async def get_puzzle(
     # visitorId 绑定与校验
     real_ip = _get_real_ip(request)
     token_data = state.session_tokens[token]
-    stored_vid = token_data.get("visitor_id")
+    stored_vid = token_data.visitor_id
 
     if stored_vid is None:
         # 首次绑定
-        token_data["visitor_id"] = body.visitorId
+        token_data.visitor_id = body.visitorId
         logger.info("Session %s bound to visitorId %.16s... (IP: %s)", token[:8], body.visitorId, real_ip)
     elif stored_vid != body.visitorId:
         # 指纹与会话已绑定的不符
@@ -142,17 +138,8 @@ async def get_puzzle(
         )
         raise HTTPException(status_code=403, detail="Device fingerprint mismatch")
 
-    return PuzzleResponse(
-        seed=state.current_seed,
-        difficulty=state.difficulty,
-        memory_cost=state.ph.memory_cost,
-        time_cost=state.ph.time_cost,
-        parallelism=state.ph.parallelism,
-        worker_count=state.worker_count,
-        puzzle_start_time=state.puzzle_start_time,
-        last_solve_time=state.last_solve_time,
-        average_solve_time=state.average_solve_time,
-    )
+    # 直接返回缓存的 JSON（重置后的拉取风暴中共享同一份序列化结果）
+    return Response(content=state.get_puzzle_json(), media_type="application/json")
 
 
 def check_nonce_speed(nonce: int, solve_time: float) -> tuple[bool, str]:
@@ -215,8 +202,8 @@ async def verify_solution(
         )
 
     # 3. 校验 visitorId 与 Session 绑定一致
-    token_data = state.session_tokens.get(token, {})
-    stored_vid = token_data.get("visitor_id")
+    token_data = state.session_tokens.get(token)
+    stored_vid = token_data.visitor_id if token_data is not None else None
     if stored_vid is not None and stored_vid != sub.visitorId:
         logger.warning(
             "visitorId mismatch on verify for token %s: stored=%.16s..., got=%.16s... (IP: %s)",
@@ -248,21 +235,13 @@ async def verify_solution(
             raise HTTPException(status_code=400, detail=speed_error)
 
         # 5.4 使用进程池验证哈希解（避免阻塞事件循环）
-        loop = asyncio.get_running_loop()
-        executor = get_process_pool()
-
-        is_valid, error_message = await loop.run_in_executor(
-            executor,
-            verify_argon2_solution,
+        is_valid, error_message = await state.verify_argon2(
             sub.nonce,
             sub.submittedSeed,
             sub.visitorId,
             real_ip,
             sub.hash,
             state.difficulty,
-            state.argon2_time_cost,
-            state.argon2_memory_cost,
-            state.argon2_parallelism,
         )
 
         if not is_valid:
@@ -347,8 +326,8 @@ async def submit_best_hash(
         raise HTTPException(status_code=403, detail="Identity mismatch")
 
     # Gate 4: visitorId 必须与 Session 绑定一致
-    token_data = state.session_tokens.get(token, {})
-    stored_vid = token_data.get("visitor_id")
+    token_data = state.session_tokens.get(token)
+    stored_vid = token_data.visitor_id if token_data is not None else None
     if stored_vid is not None and stored_vid != sub.visitorId:
         raise HTTPException(status_code=403, detail="Device fingerprint mismatch")
 
@@ -364,7 +343,7 @@ async def submit_best_hash(
 
     async with state.lock:
         # Gate 1: 收集窗口必须开放
-        if state.timeout_window_end is None or time.time() > state.timeout_window_end:
+        if state.timeout_window_end is None or time.monotonic() > state.timeout_window_end:
             raise HTTPException(status_code=409, detail="No active timeout collection window")
 
         # Gate 2: Seed 必须匹配超时时的 seed
@@ -375,7 +354,11 @@ async def submit_best_hash(
         if any(s["ip"] == real_ip for s in state.timeout_submissions):
             return {"status": "already_submitted"}
 
-        winner_ws = token_data.get("websocket") if token_data.get("is_connected") else None
+        winner_ws = (
+            token_data.websocket
+            if token_data is not None and token_data.is_connected
+            else None
+        )
 
         state.timeout_submissions.append(
             {
@@ -470,8 +453,7 @@ async def websocket_endpoint(websocket: WebSocket):
         old_ws = state.get_ip_connection(real_ip)
         if old_ws is not None:
             try:
-                state.active_connections.discard(old_ws)
-                state.remove_client_hashrate(old_ws)
+                state.remove_connection(old_ws)
                 state.stop_miner(old_ws)
                 state.unregister_ip_connection(real_ip, old_ws)
                 await old_ws.close(code=1008, reason="Replaced by new connection")
@@ -483,7 +465,7 @@ async def websocket_endpoint(websocket: WebSocket):
 
         # 接受连接
         await websocket.accept()
-        state.active_connections.add(websocket)
+        state.add_connection(websocket, real_ip)
         state.register_ip_connection(real_ip, websocket)
 
         # 重新激活 Token（更新 WebSocket 引用和连接状态）
@@ -523,12 +505,15 @@ async def websocket_endpoint(websocket: WebSocket):
 
         # 接受连接
         await websocket.accept()
-        state.active_connections.add(websocket)
+        state.add_connection(websocket, real_ip)
         state.register_ip_connection(real_ip, websocket)
 
         # 生成并下发 Session Token（仅在首次连接时生成新的）
         session_token = state.generate_session_token(websocket, real_ip)
-        await websocket.send_json({"type": "SESSION_TOKEN", "token": session_token})
+        # 经写协程队列发送，与之后的广播保持先后顺序
+        state.send_to_connection(
+            websocket, json_dumps({"type": "SESSION_TOKEN", "token": session_token})
+        )
         logger.info("Session Token sent to %s", real_ip)
 
     try:
@@ -538,15 +523,17 @@ async def websocket_endpoint(websocket: WebSocket):
 
             # 消息大小限制（防止超大消息占用资源）
             if len(data) > 4096:
+                # 先发完已入队的消息并停止写协程，之后此处是唯一的发送方
+                await state.drain_writer(websocket)
                 await websocket.send_text(
-                    json.dumps({"type": "ERROR", "detail": "Message too large"})
+                    json_dumps({"type": "ERROR", "detail": "Message too large"})
                 )
                 await websocket.close(code=1009, reason="Message too large")
                 return
 
             # 尝试解析 JSON 消息
             try:
-                message_data = json.loads(data)
+                message_data = json_loads(data)
                 msg_type = message_data.get("type")
             except (json.JSONDecodeError, AttributeError):
                 # 兼容旧的纯文本 "ping" 消息
@@ -559,8 +546,9 @@ async def websocket_endpoint(websocket: WebSocket):
             if msg_type == "ping":
                 # 现有的心跳逻辑
                 online_count = len(state.active_connections)
-                pong_message = json.dumps({"type": "PONG", "online": online_count})
-                await websocket.send_text(pong_message)
+                pong_message = json_dumps({"type": "PONG", "online": online_count})
+                # 与广播共用发送队列，保证同一连接上的消息顺序
+                state.send_to_connection(websocket, pong_message)
 
             elif msg_type == "mining_start":
                 # 新增：矿工开始挖矿
@@ -580,10 +568,10 @@ async def websocket_endpoint(websocket: WebSocket):
                 max_rate = state.max_nonce_speed if state.max_nonce_speed > 0 else float("inf")
                 if isinstance(rate, (int, float)) and 0 <= rate:
                     if rate < max_rate:
-                        await state.update_client_hashrate(websocket, rate, real_ip)
+                        state.update_client_hashrate(websocket, rate)
                     else:
                         logger.warning("Overspeed hashrate from %s: %.1f H/s (limit: %.1f H/s)", real_ip, rate, max_rate)
-                        await state.update_overspeed_hashrate(websocket, rate, real_ip)
+                        state.update_overspeed_hashrate(websocket, rate)
                 else:
                     logger.warning("Invalid hashrate from %s: %s", real_ip, rate)
 
@@ -594,8 +582,7 @@ async def websocket_endpoint(websocket: WebSocket):
     finally:
         # ===== 关键修复：确保所有退出路径都清理资源 =====
         # 无论是正常断开、异常还是其他情况，都必须清理连接
-        state.active_connections.discard(websocket)
-        state.remove_client_hashrate(websocket)
+        state.remove_connection(websocket)  # 同时移除算力数据
         state.stop_miner(websocket)  # 停止挖矿计时
         state.revoke_session_token(websocket)  # 清理 Session Token
         state.unregister_ip_connection(real_ip, websocket)  # 移除 IP 连接映射
@@ -1,9 +1,13 @@
 import base64
 import hashlib
 import hmac
+from functools import partial
 
 import argon2.low_level as alg
 
+# 固定参数预绑定的底层 Argon2d（32 字节输出），跳过高层封装的参数校验
+_argon2d_raw = partial(alg.hash_secret_raw, hash_len=32, type=alg.Type.D)
+
 
 def verify_argon2_solution(
     nonce: int,
@@ -39,14 +43,12 @@ def verify_argon2_solution(
 
     # 重新计算哈希（使用与配置一致的参数）
     try:
-        raw_hash = alg.hash_secret_raw(
-            secret=str(nonce).encode("utf-8"),
-            salt=salt_raw,
+        raw_hash = _argon2d_raw(
+            str(nonce).encode("utf-8"),
+            salt_raw,
             time_cost=time_cost,
             memory_cost=memory_cost,
             parallelism=parallelism,
-            hash_len=32,
-            type=alg.Type.D,
         )
         hash_hex = raw_hash.hex()
 
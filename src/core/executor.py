@@ -3,6 +3,7 @@
 
 使用 ProcessPoolExecutor 绕过 Python GIL，避免 Argon2 验证阻塞事件循环
 """
+import asyncio
 import logging
 import os
 from concurrent.futures import ProcessPoolExecutor
@@ -11,6 +12,126 @@ logger = logging.getLogger(__name__)
 
 # 全局进程池实例
 _executor: ProcessPoolExecutor | None = None
+_max_workers: int = 0
+
+# Argon2 验证可占用的可用内存比例（并发验证数 × memory_cost 不超过该比例）
+ARGON2_MEMORY_FRACTION = 0.5
+
+
+def _allowed_cpus() -> list[int]:
+    """当前进程可调度的逻辑 CPU 编号（遵循容器 / taskset 设置的 CPU 亲和性）"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def physical_cores() -> int:
+    """
+    当前进程可用的物理核心数（超线程的兄弟线程只计一次）
+
+    Argon2 的 parallelism 超过物理核心数只会互相争抢，因此进程池与验证并发
+    按物理核心而非逻辑线程计算。Linux 上按 sysfs 的
+    topology/thread_siblings_list 去重；无法读取拓扑时退化为逻辑 CPU 数。
+    """
+    cpus = _allowed_cpus()
+    cores = set()
+    for cpu in cpus:
+        try:
+            with open(
+                f"/sys/devices/system/cpu/cpu{cpu}/topology/thread_siblings_list"
+            ) as f:
+                cores.add(f.read().strip())
+        except OSError:
+            return len(cpus) or 1
+    return len(cores) or 1
+
+
+def _read_int(path: str) -> int | None:
+    """读取只含一个整数的文件（cgroup 接口），不存在或为 "max" 时返回 None"""
+    try:
+        with open(path) as f:
+            value = f.read().strip()
+    except OSError:
+        return None
+    return int(value) if value.isdigit() else None
+
+
+def available_memory() -> int | None:
+    """
+    当前可用于新分配的内存字节数
+
+    取主机可用内存（/proc/meminfo 的 MemAvailable，退化为 SC_AVPHYS_PAGES）
+    与 cgroup 剩余配额（v2 memory.max - memory.current，或 v1 limit_in_bytes - usage_in_bytes）
+    中的较小值；均无法获取时返回 None。
+    """
+    candidates = []
+
+    host = None
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    host = int(line.split()[1]) * 1024
+                    break
+    except (OSError, ValueError, IndexError):
+        pass
+    if host is None:
+        try:
+            host = os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+        except (AttributeError, ValueError, OSError):
+            pass
+    if host is not None and host > 0:
+        candidates.append(host)
+
+    for limit_path, usage_path in (
+        ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory.current"),
+        (
+            "/sys/fs/cgroup/memory/memory.limit_in_bytes",
+            "/sys/fs/cgroup/memory/memory.usage_in_bytes",
+        ),
+    ):
+        limit = _read_int(limit_path)
+        if limit is None or limit >= 1 << 60:  # 未设置限制（v1 以极大值表示）
+            continue
+        usage = _read_int(usage_path) or 0
+        candidates.append(max(0, limit - usage))
+        break
+
+    return min(candidates) if candidates else None
+
+
+def memory_bound_workers(memory_cost_kib: int) -> int | None:
+    """
+    按可用内存计算可同时进行的 Argon2 验证数量上限
+
+    在调用时刻取样（启动与修改 Argon2 参数时），之后不随内存波动调整。
+
+    Args:
+        memory_cost_kib: 单次验证的 memory_cost（KiB）
+
+    Returns:
+        上限（至少为 1）；平台无法获取可用内存时返回 None（不限制）
+    """
+    available = available_memory()
+    if available is None:
+        return None
+    return max(1, int(available * ARGON2_MEMORY_FRACTION) // (max(1, memory_cost_kib) * 1024))
+
+
+def argon2_concurrency_limit(memory_cost_kib: int, parallelism: int) -> int:
+    """
+    计算 Argon2 验证并发上限
+
+    同时受 CPU（可用物理核心数 / parallelism，避免线程超额订阅）
+    与内存（并发数 × memory_cost 不超过可用内存（含 cgroup 配额）的一半，避免 OOM）约束。
+    会同步读取 sysfs / cgroup / /proc 文件，不要在事件循环的临界区内调用
+    （运行时请经 asyncio.to_thread 在锁外计算）。
+    """
+    limit = max(1, physical_cores() // max(1, parallelism))
+    mem_limit = memory_bound_workers(memory_cost_kib)
+    if mem_limit is not None:
+        limit = min(limit, mem_limit)
+    return limit
 
 
 def init_process_pool(max_workers: int | None = None) -> ProcessPoolExecutor:
@@ -18,27 +139,52 @@ def init_process_pool(max_workers: int | None = None) -> ProcessPoolExecutor:
     初始化进程池
 
     Args:
-        max_workers: 最大工作进程数，默认为 CPU 核心数
+        max_workers: 最大工作进程数，默认为可用物理核心数 - 1
 
     Returns:
         ProcessPoolExecutor 实例
     """
-    global _executor
+    global _executor, _max_workers
 
     if _executor is not None:
         raise RuntimeError("Process pool already initialized")
 
-    # 默认使用 CPU 核心数，但至少保留 1 个核心给主进程
+    # 默认使用可用物理核心数，但至少保留 1 个核心给主进程
     if max_workers is None:
-        cpu_count = os.cpu_count() or 1
-        max_workers = max(1, cpu_count - 1)
+        max_workers = max(1, physical_cores() - 1)
 
     _executor = ProcessPoolExecutor(max_workers=max_workers)
+    _max_workers = max_workers
     logger.info("Process pool initialized with %d workers", max_workers)
 
     return _executor
 
 
+def _warmup_worker() -> int:
+    """在工作进程中预先导入验证模块（argon2 C 扩展），返回进程 PID"""
+    import src.core.crypto  # noqa: F401
+
+    return os.getpid()
+
+
+async def warmup_process_pool() -> None:
+    """
+    预热进程池：提前拉起全部工作进程并完成模块导入
+
+    ProcessPoolExecutor 按需创建进程，否则首批提交的验证请求
+    需要额外承担进程启动与 argon2 导入的延迟。
+    """
+    executor = get_process_pool()
+    loop = asyncio.get_running_loop()
+    pids = await asyncio.gather(
+        *(
+            loop.run_in_executor(executor, _warmup_worker)
+            for _ in range(_max_workers)
+        )
+    )
+    logger.info("Process pool warmed up (%d worker process(es))", len(set(pids)))
+
+
 def get_process_pool() -> ProcessPoolExecutor:
     """
     获取全局进程池实例
@@ -0,0 +1,29 @@
+"""JSON 编解码（优先使用 orjson，缺失时回退到标准库 json）"""
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # orjson 缺失时回退到标准库 json
+    orjson = None
+
+
+def json_dumps(obj: Any) -> str:
+    """序列化为紧凑 JSON 字符串（WebSocket 文本帧，前端以 JSON.parse 解析）"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def json_dumps_pretty(obj: Any) -> bytes:
+    """序列化为带 2 空格缩进的 UTF-8 字节（用于落盘文件，便于人工查看）"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """解析 JSON；格式错误时抛出 json.JSONDecodeError（orjson 的异常为其子类）"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
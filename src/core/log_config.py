@@ -1,8 +1,10 @@
 """Centralized logging configuration for HashPass"""
 
+import atexit
 import logging
 import logging.handlers
 import os
+import queue
 import sys
 from multiprocessing import current_process
 from pathlib import Path
@@ -104,6 +106,25 @@ class LockedTimedRotatingFileHandler(logging.handlers.TimedRotatingFileHandler):
             super().close()
 
 
+def _attach_handlers(root: logging.Logger, level: int, *handlers: logging.Handler) -> None:
+    """
+    通过 QueueHandler 挂载处理器
+
+    日志记录只入队，stdout 输出与加锁的文件写入由 QueueListener 后台线程完成，
+    避免在事件循环线程上执行阻塞 I/O。
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
+
+    root.setLevel(level)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root._hashpass_logging_configured = True
+
+
 def setup_logging() -> None:
     """
     Configure the root logger for the application.
@@ -112,6 +133,7 @@ def setup_logging() -> None:
     - TimedRotatingFileHandler to log/hashpass.log (daily rotation, 30 days retention)
     - Format: %(asctime)s [%(name)s] %(levelname)s %(message)s
     - Default level: INFO, configurable via HASHPASS_LOG_LEVEL env var
+    - Handlers run on a QueueListener thread (records are only enqueued on the caller's thread)
     """
     root = logging.getLogger()
     if getattr(root, "_hashpass_logging_configured", False):
@@ -140,9 +162,7 @@ def setup_logging() -> None:
     if not log_dir.exists():
         print(f"ERROR: Failed to create log directory: {log_dir.absolute()}", file=sys.stderr)
         # 仅使用 StreamHandler
-        root.setLevel(level)
-        root.addHandler(stream_handler)
-        root._hashpass_logging_configured = True
+        _attach_handlers(root, level, stream_handler)
         return
 
     try:
@@ -160,10 +180,7 @@ def setup_logging() -> None:
         if not file_handler.stream:
             print(f"WARNING: File handler stream not initialized", file=sys.stderr)
 
-        root.setLevel(level)
-        root.addHandler(stream_handler)
-        root.addHandler(file_handler)
-        root._hashpass_logging_configured = True
+        _attach_handlers(root, level, stream_handler, file_handler)
 
         # 写入测试日志验证文件处理器工作正常
         root.info("Logging system initialized successfully")
@@ -171,7 +188,5 @@ def setup_logging() -> None:
     except Exception as e:
         print(f"ERROR: Failed to initialize file handler: {e}", file=sys.stderr)
         # 降级到仅使用 StreamHandler
-        root.setLevel(level)
-        root.addHandler(stream_handler)
-        root._hashpass_logging_configured = True
+        _attach_handlers(root, level, stream_handler)
         root.warning("File logging disabled due to initialization error")
@@ -1,21 +1,99 @@
 import asyncio
-import json
+import heapq
+import ipaddress
 import logging
 import math
 import os
 import secrets
 import time
-from collections import deque
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional, Set
+from typing import Dict, Optional, Set, Union
 
 import aiofiles
-from argon2 import PasswordHasher, Type
+import aiofiles.os
 from fastapi import WebSocket
 
+from src.core.crypto import verify_argon2_solution
+from src.core.executor import argon2_concurrency_limit, get_process_pool
+from src.core.jsonutil import json_dumps, json_dumps_pretty, json_loads
+
 logger = logging.getLogger(__name__)
 
 
+# IP 的内存表示：IPv4 为 32 位整数，IPv6 为带 1<<128 标记的 128 位整数
+# 无法解析为 IP 的值（如测试客户端）保留原字符串
+IPKey = Union[int, str]
+
+_IPV6_TAG = 1 << 128
+
+
+@lru_cache(maxsize=4096)
+def _ip_key(ip: str) -> IPKey:
+    """将 IP 字符串规范化为紧凑的整数键（热点 IP 命中缓存，无需重复解析）"""
+    try:
+        addr = ipaddress.ip_address(ip)
+    except ValueError:
+        return ip
+    if addr.version == 6:
+        return int(addr) | _IPV6_TAG
+    return int(addr)
+
+
+def _parse_ban_entry(entry: str) -> Optional[tuple[int, int, int]]:
+    """
+    解析 CIDR 黑名单条目
+
+    Returns:
+        (IP 版本, 前缀长度, 网络号右移后的整数)；非 CIDR 或单主机前缀返回 None
+    """
+    if "/" not in entry:
+        return None
+    try:
+        net = ipaddress.ip_network(entry, strict=False)
+    except ValueError:
+        return None
+    if net.prefixlen == net.max_prefixlen:
+        return None
+    shift = net.max_prefixlen - net.prefixlen
+    return net.version, net.prefixlen, int(net.network_address) >> shift
+
+
+def _ip_from_key(key: IPKey) -> str:
+    """将整数键还原为 IP 字符串"""
+    if isinstance(key, str):
+        return key
+    if key & _IPV6_TAG:
+        return str(ipaddress.IPv6Address(key ^ _IPV6_TAG))
+    return str(ipaddress.IPv4Address(key))
+
+
+@dataclass(slots=True)
+class Session:
+    """Session Token 绑定的会话记录（__slots__，比等价 dict 更省内存）"""
+
+    websocket: Optional[WebSocket]  # 当前 WebSocket（断开后为 None，避免内存泄漏）
+    ip: str
+    created_at: float
+    disconnected_at: Optional[float] = None  # WebSocket 断开时间（time.monotonic）
+    is_connected: bool = True  # 当前是否连接
+    visitor_id: Optional[str] = None  # 首次 /puzzle 时绑定的设备指纹
+    revoked: bool = False
+
+
+@dataclass(slots=True)
+class ConnMeta:
+    """矿工连接的元数据（连接 IP 与最近一次算力上报）"""
+
+    ip: str
+    connected_at: float  # time.monotonic
+    rate: float = 0.0
+    last_seen: Optional[float] = None  # 最近一次算力上报时间（time.monotonic，未上报或已过时为 None）
+    overspeed: bool = False  # 最近一次上报是否超过 max_nonce_speed
+
+
 class SystemState:
     """全局内存状态 - 维护原子锁和谜题"""
 
@@ -34,16 +112,24 @@ class SystemState:
         # 时间跟踪
         self.puzzle_start_time = time.time()  # 当前puzzle开始时间（绝对时间）
         self.last_solve_time: Optional[float] = None  # 上次解题耗时
-        self.solve_history: deque[float] = deque(maxlen=5)  # 最近5次解题耗时
+        # 最近5次解题耗时：环形缓冲区 + 运行总和，O(1) 追加与求平均
+        self.solve_history_size: int = 5
+        self.solve_history: list[float] = [0.0] * self.solve_history_size
+        self._sh_pos: int = 0  # 下一个写入位置
+        self._sh_count: int = 0  # 已记录条数（<= solve_history_size）
+        self._sh_sum: float = 0.0
 
         # EMA 平滑系数（N=5）
         self.ema_alpha: float = 2.0 / (5 + 1)
         self.ema_solve_time: Optional[float] = None
 
+        # 上次难度调整的单调时钟时间（用于按间隔限制单次步长）
+        self._last_adjust_mono: float = time.monotonic()
+
         # 挖矿状态跟踪（只在有矿工挖矿时计时）
         self.active_miners: Set[WebSocket] = set()  # 正在挖矿的矿工连接
         self.total_mining_time: float = 0.0  # 累计挖矿时间（秒）
-        self.last_mining_state_change: Optional[float] = None  # 上次挖矿状态改变时间
+        self.last_mining_state_change: Optional[float] = None  # 上次挖矿状态改变时间（单调时钟）
         self.is_mining_active: bool = False  # 当前是否有矿工在挖矿
 
         # HMAC 密钥 - 用于派生邀请码（私有，不对外暴露）
@@ -65,42 +151,56 @@ class SystemState:
         # 最大允许计算速度（nonce/秒），0 表示禁用检查
         self.max_nonce_speed = float(os.getenv("HASHPASS_MAX_NONCE_SPEED", "0"))
 
-        self.ph = PasswordHasher(
-            time_cost=self.argon2_time_cost,
-            memory_cost=self.argon2_memory_cost,
-            parallelism=self.argon2_parallelism,
-            hash_len=32,
-            type=Type.D,
+        # Argon2 验证并发上限（每次验证占用 memory_cost 内存与 parallelism 个核心）
+        self._argon2_sem = asyncio.Semaphore(
+            argon2_concurrency_limit(self.argon2_memory_cost, self.argon2_parallelism)
         )
 
         # WebSocket 连接管理
-        self.active_connections: Set[WebSocket] = set()
+        # 连接 / 会话容器的所有增删都是同步操作，不跨 await，单事件循环内天然互斥；
+        # 需要在 await 之间遍历时一律先取不可变快照（*_view），因此无需额外加锁
+        # 矿工连接 -> 元数据（兼作算力跟踪）
+        self.active_connections: Dict[WebSocket, ConnMeta] = {}
+        self._active_snapshot: Optional[tuple] = None  # 成员变化时置空
+
+        # 每个连接（含 Admin）的发送队列与专属写协程
+        self.send_queue_size: int = 256
+        self._send_queues: Dict[WebSocket, asyncio.Queue] = {}
+        self._writer_tasks: Dict[WebSocket, asyncio.Task] = {}
+        # 队列已满时暂存的最新一条可丢弃消息（如算力统计），写协程排空队列后补发；
+        # 新消息覆盖旧消息，已入队的关键消息永不被挤掉
+        self._pending_latest: Dict[WebSocket, dict] = {}
+
+        # 全网算力广播去抖：统计无明显变化时跳过，每 N 个周期强制广播一次
+        self._last_hashrate_stats: Optional[tuple[float, int]] = None
+        self._hashrate_skipped_ticks: int = 0
+        self.hashrate_force_every: int = 6
 
         # Session Token 管理（Token -> WebSocket + IP 映射）
-        self.session_tokens: Dict[str, Dict[str, Any]] = {}
-        # 结构: {
-        #   "token_string": {
-        #     "websocket": <WebSocket对象或None>,
-        #     "ip": "203.0.113.45",
-        #     "created_at": 1704712800.0,
-        #     "disconnected_at": None或时间戳,  # WebSocket断开时间
-        #     "is_connected": True/False         # 当前是否连接
-        #   }
-        # }
+        self.session_tokens: Dict[str, Session] = {}
         self.token_expiry_seconds = 300  # Token未连接过期时间：5分钟
+        # 反向索引：IP / WebSocket -> Token 集合，避免吊销时遍历全部会话
+        self._tokens_by_ip: Dict[str, Set[str]] = {}
+        self._tokens_by_ws: Dict[WebSocket, Set[str]] = {}
+        # 过期最小堆：(过期时刻, Token)，清理时只弹出已到期的条目
+        self._expiry_heap: list[tuple[float, str]] = []
 
-        # 客户端算力跟踪
-        self.client_hashrates: Dict[WebSocket, Dict[str, float]] = {}
-        # 结构: {websocket: {"rate": 123.45, "timestamp": 1234567890.123, "ip": "1.2.3.4"}}
-
-        # 超速矿工跟踪（上报算力超过 max_nonce_speed 的矿工）
-        self.overspeed_hashrates: Dict[WebSocket, Dict[str, Any]] = {}
-        # 结构同 client_hashrates，额外含 "reported_rate" 字段（实际上报值）
+        # 算力聚合任务（算力数据存放在 active_connections 的 ConnMeta 中）
         self.aggregation_task: Optional[asyncio.Task] = None
         self.hashrate_stale_timeout: float = 10.0  # 10秒无更新视为过时
+        # 计入全网算力的矿工（按最近上报时间升序）及其算力累计值：
+        # 聚合时只需从队首弹出过时条目，无需遍历全部连接
+        self._live_miners: "OrderedDict[WebSocket, ConnMeta]" = OrderedDict()
+        self._live_total: float = 0.0
+        # 计入全网算力的矿工增减时置位，聚合任务被唤醒后立即广播（最少间隔 1 秒）
+        self._hashrate_changed = asyncio.Event()
 
         # 超时检查任务
         self.timeout_task: Optional[asyncio.Task] = None
+        # 挖矿计时从暂停恢复时置位，唤醒等待中的超时检查
+        self._mining_resumed = asyncio.Event()
+        # 谜题重置或超时参数变化时置位，唤醒常驻的超时检查重新计算剩余时间
+        self._puzzle_reset = asyncio.Event()
 
         # 超时奖励状态
         self.timed_out_seed: Optional[str] = None
@@ -115,9 +215,25 @@ class SystemState:
 
         # Admin WebSocket 连接集合
         self.admin_connections: Set[WebSocket] = set()
+        self._admin_snapshot: Optional[tuple] = None  # 成员变化时置空
+
+        # Admin STATUS_UPDATE 消息缓存（按单调时钟秒分桶，同一秒内所有 Admin 连接复用）
+        self._status_msg: Optional[str] = None
+        self._status_event: Optional[dict] = None  # 对应的 ASGI 发送事件
+        self._status_msg_key: int = -1
+        # /puzzle 响应 JSON 缓存：重置后所有矿工会同时拉取同一份题目，按字段值判定失效
+        self._puzzle_json: Optional[str] = None
+        self._puzzle_key: Optional[tuple] = None
 
         # IP 黑名单（持久化到 blacklist.json）
-        self.banned_ips: Set[str] = set()
+        self.banned_ips: Set[IPKey] = set()
+        # CIDR 段黑名单：(IP 版本, 前缀长度) -> 网络号集合，查询时每个前缀长度一次哈希
+        self._banned_networks: Dict[tuple[int, int], Set[int]] = {}
+        # 排序后的黑名单缓存与未持久化标记（黑名单变更时失效 / 置位）
+        self._banned_sorted: Optional[list[str]] = None
+        self._blacklist_dirty: bool = False
+        # 串行化黑名单落盘：并发保存共用同一个临时文件，交错写入会产生损坏的 JSON
+        self._blacklist_save_lock = asyncio.Lock()
 
         # 管理面板图表历史（内存态，最多 50 点）
         self.chart_history_max: int = 50
@@ -125,7 +241,7 @@ class SystemState:
         self.solve_time_chart_history: list = []  # 平均求解用时（每次解题时追加）
 
         # IP -> WebSocket 映射，追踪每个 IP 的活跃连接（限制同 IP 多开）
-        self.ip_connections: Dict[str, WebSocket] = {}
+        self.ip_connections: Dict[IPKey, WebSocket] = {}
 
         self._load_ema_from_history()
 
@@ -135,7 +251,7 @@ class SystemState:
             p = Path(path)
             if not p.exists():
                 return
-            data = json.loads(p.read_text(encoding="utf-8"))
+            data = json_loads(p.read_bytes())
             if not isinstance(data, list) or not data:
                 return
             N = round(2.0 / self.ema_alpha) - 1  # = 5
@@ -166,65 +282,85 @@ class SystemState:
         self.total_mining_time = 0.0
         self.last_mining_state_change = None
         self.is_mining_active = False
+        self._status_msg_key = -1
 
     def start_miner(self, ws: WebSocket) -> None:
         """记录矿工开始挖矿"""
-        if ws in self.active_miners:
+        miners = self.active_miners
+        count = len(miners)
+        miners.add(ws)  # 一次哈希完成「是否已在挖矿」判断与插入
+        if len(miners) == count:
             return  # 已经在挖矿
 
         # 如果是第一个矿工，开始计时
-        if len(self.active_miners) == 0:
+        if count == 0:
             self.is_mining_active = True
-            self.last_mining_state_change = time.time()
+            self.last_mining_state_change = time.monotonic()
+            self._mining_resumed.set()
             logger.debug("Mining timer started - first miner online")
 
-        self.active_miners.add(ws)
-        logger.debug("Miner online | active miners: %d", len(self.active_miners))
+        logger.debug("Miner online | active miners: %d", count + 1)
 
     def stop_miner(self, ws: WebSocket) -> None:
         """记录矿工停止挖矿"""
-        if ws not in self.active_miners:
+        miners = self.active_miners
+        try:
+            miners.remove(ws)
+        except KeyError:
             return  # 本来就没在挖矿
 
-        self.active_miners.discard(ws)
-
         # 如果是最后一个矿工，暂停计时
-        if len(self.active_miners) == 0 and self.is_mining_active:
+        if not miners and self.is_mining_active:
             self._pause_mining_timer()
             logger.debug("Mining timer paused - all miners offline")
 
-        logger.debug("Miner offline | active miners: %d", len(self.active_miners))
+        logger.debug("Miner offline | active miners: %d", len(miners))
 
     def _pause_mining_timer(self) -> None:
         """暂停挖矿计时（内部方法）"""
         if self.is_mining_active and self.last_mining_state_change is not None:
-            elapsed = time.time() - self.last_mining_state_change
+            elapsed = time.monotonic() - self.last_mining_state_change
             self.total_mining_time += elapsed
             self.is_mining_active = False
             self.last_mining_state_change = None
 
-    def get_current_mining_time(self) -> float:
+    def get_current_mining_time(self, now: Optional[float] = None) -> float:
         """
         获取当前puzzle的累计挖矿时间（秒）
         只统计有矿工在线挖矿的时间
+
+        Args:
+            now: 调用方已取得的 time.monotonic() 值（可选，避免重复取时间）
         """
         if self.is_mining_active and self.last_mining_state_change is not None:
             # 当前正在挖矿，加上当前段的时间
-            current_segment = time.time() - self.last_mining_state_change
+            if now is None:
+                now = time.monotonic()
+            current_segment = now - self.last_mining_state_change
             return self.total_mining_time + current_segment
         else:
             # 当前暂停中，返回累计时间
             return self.total_mining_time
 
-    def _calculate_smooth_adjustment(self, effective_time: float) -> float:
+    def _calculate_smooth_adjustment(
+        self, effective_time: float, max_step: float = 4.0
+    ) -> float:
         """
         平滑比例控制：step = log2(target_time / effective_time)
         - 无死区、无 floor 离散化
-        - 限幅到 [-4.0, +4.0]
+        - 限幅到 [-max_step, +max_step]
         """
         ratio = self.target_time / max(effective_time, 0.1)
         step = math.log2(ratio)
-        return max(-4.0, min(step, 4.0))
+        return max(-max_step, min(step, max_step))
+
+    def _adjustment_cap(self, now: float) -> float:
+        """
+        按距上次调整的时间比例限幅：cap = 4 * dt / target_time，夹在 [0.25, 4.0]
+        连续快速解题时每次只能小步调整，避免难度阶梯式偏离目标
+        """
+        dt = now - self._last_adjust_mono
+        return min(4.0, max(0.25, 4.0 * dt / max(self.target_time, 1)))
 
     def adjust_difficulty(self, solve_time: float) -> tuple[int, int, str]:
         """
@@ -246,8 +382,12 @@ class SystemState:
                 self.ema_alpha * solve_time + (1 - self.ema_alpha) * self.ema_solve_time
             )
 
-        # 用 EMA 计算连续步长
-        step = self._calculate_smooth_adjustment(self.ema_solve_time)
+        # 用 EMA 计算连续步长（步长上限与距上次调整的间隔成正比）
+        now = time.monotonic()
+        step = self._calculate_smooth_adjustment(
+            self.ema_solve_time, self._adjustment_cap(now)
+        )
+        self._last_adjust_mono = now
 
         # 累加到浮点难度并 clamp
         new_float = max(
@@ -280,10 +420,16 @@ class SystemState:
 
     def record_solve_time(self, solve_time: float) -> None:
         """记录解题耗时到滑动窗口历史（在原子锁内调用）"""
-        self.solve_history.append(solve_time)
+        size = self.solve_history_size
+        evicted = self.solve_history[self._sh_pos] if self._sh_count == size else 0.0
+        self._sh_sum += solve_time - evicted
+        self.solve_history[self._sh_pos] = solve_time
+        self._sh_pos = (self._sh_pos + 1) % size
+        self._sh_count = min(size, self._sh_count + 1)
         self.solve_time_chart_history.append(solve_time)
         if len(self.solve_time_chart_history) > self.chart_history_max:
             self.solve_time_chart_history.pop(0)
+        self._status_msg_key = -1
 
     def _clear_timeout_window_state(self, round_id: Optional[int] = None) -> bool:
         """清空超时奖励窗口状态；若指定 round_id，仅清理匹配轮次。"""
@@ -311,97 +457,125 @@ class SystemState:
 
     @property
     def average_solve_time(self) -> Optional[float]:
-        if not self.solve_history:
+        if not self._sh_count:
             return None
-        return round(sum(self.solve_history) / len(self.solve_history), 2)
+        return round(self._sh_sum / self._sh_count, 2)
+
+    def _solve_history_list(self) -> list[float]:
+        """按时间顺序（旧 -> 新）返回滑动窗口中的解题耗时"""
+        if self._sh_count < self.solve_history_size:
+            return self.solve_history[: self._sh_count]
+        return self.solve_history[self._sh_pos :] + self.solve_history[: self._sh_pos]
 
     async def start_timeout_checker(self):
-        """启动超时检查任务"""
-        if self.timeout_task and not self.timeout_task.done():
-            self.timeout_task.cancel()
+        """
+        启动超时检查任务（全程只有一个常驻任务）
 
-        self.timeout_task = asyncio.create_task(self._check_timeout())
+        任务已在运行时不再重建，只唤醒它按新谜题 / 新参数重新计算剩余时间，
+        因此任务数量与重置频率无关。
+        """
+        if self.timeout_task is None or self.timeout_task.done():
+            self.timeout_task = asyncio.create_task(self._check_timeout())
+        else:
+            self._puzzle_reset.set()
+
+    async def stop_timeout_checker(self) -> None:
+        """停止超时检查任务（连同尚未完成的超时奖励任务）并等待其退出"""
+        tasks = [
+            task
+            for task in (self.timeout_task, self.timeout_award_task)
+            if task is not None and not task.done()
+        ]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.timeout_task = None
+        self.timeout_award_task = None
 
     async def _check_timeout(self):
         """
         检查puzzle是否超时，超时则降低难度并重置
         只在有矿工挖矿时计时（挖矿时间累计达到target_timeout才超时）
         """
-        try:
-            check_interval = 5.0  # 每5秒检查一次
-
-            while True:
-                await asyncio.sleep(check_interval)
-
-                # 获取当前累计挖矿时间
-                mining_time = self.get_current_mining_time()
+        reset = self._puzzle_reset
+        while True:
+            try:
+                # 获取当前累计挖矿时间（本轮检查只取一次单调时钟）
+                now = time.monotonic()
+                mining_time = self.get_current_mining_time(now)
+                remaining = self.target_timeout - mining_time
+
+                if remaining > 0:
+                    reset.clear()
+                    if self.is_mining_active:
+                        # 计时进行中：睡到预计超时时刻，谜题重置时提前唤醒
+                        # （期间若暂停，醒来后重新计算）
+                        try:
+                            await asyncio.wait_for(reset.wait(), max(0.1, remaining))
+                        except asyncio.TimeoutError:
+                            pass
+                    else:
+                        # 计时暂停：等待矿工上线恢复计时，不做周期性轮询
+                        self._mining_resumed.clear()
+                        await self._mining_resumed.wait()
+                    continue
 
-                # 检查是否超时（只看挖矿时间）
-                if mining_time >= self.target_timeout:
-                    # 进入锁检查是否仍然是同一个puzzle
-                    async with self.lock:
-                        # 二次确认超时（防止在等待锁期间puzzle已被解出）
-                        mining_time = self.get_current_mining_time()
+                # 已超时（只看挖矿时间），进入锁检查是否仍然是同一个puzzle
+                async with self.lock:
+                    # 二次确认超时（防止在等待锁期间puzzle已被解出）
+                    mining_time = self.get_current_mining_time(now)
 
-                        if mining_time < self.target_timeout:
-                            continue
+                    if mining_time < self.target_timeout:
+                        continue
 
-                        timed_out_seed = self.current_seed  # 重置前快照
+                    timed_out_seed = self.current_seed  # 重置前快照
 
-                        # 将 target_timeout 作为虚拟解题时间注入 EMA
-                        old_difficulty, new_difficulty, reason = self.adjust_difficulty(
-                            self.target_timeout
-                        )
+                    # 将 target_timeout 作为虚拟解题时间注入 EMA
+                    old_difficulty, new_difficulty, reason = self.adjust_difficulty(
+                        self.target_timeout
+                    )
 
-                        logger.info(
-                            "Difficulty adjustment (timeout %.1fs >= %ds): %s: %d -> %d",
-                            mining_time,
-                            self.target_timeout,
-                            reason,
-                            old_difficulty,
-                            new_difficulty,
-                        )
+                    logger.info(
+                        "Difficulty adjustment (timeout %.1fs >= %ds): %s: %d -> %d",
+                        mining_time,
+                        self.target_timeout,
+                        reason,
+                        old_difficulty,
+                        new_difficulty,
+                    )
 
-                        await self.close_timeout_window()
+                    await self.close_timeout_window()
 
-                        collection_window = 10.0
-                        self.timeout_round_seq += 1
-                        timeout_round_id = self.timeout_round_seq
-                        self.active_timeout_round_id = timeout_round_id
-                        self.timed_out_seed = timed_out_seed
-                        self.timeout_window_end = time.time() + collection_window
-                        self.timeout_submissions = []
+                    collection_window = 10.0
+                    self.timeout_round_seq += 1
+                    timeout_round_id = self.timeout_round_seq
+                    self.active_timeout_round_id = timeout_round_id
+                    self.timed_out_seed = timed_out_seed
+                    self.timeout_window_end = time.monotonic() + collection_window
+                    self.timeout_submissions = []
 
-                        # 重置puzzle
-                        self.reset_puzzle()
+                    # 重置puzzle（本任务继续检查新谜题，无需重建）
+                    self.reset_puzzle()
 
-                        # 锁内快照消息（带超时标记）
-                        reset_msg = self.get_puzzle_reset_message(is_timeout=True)
+                    # 锁内快照消息（带超时标记）
+                    reset_msg = self.get_puzzle_reset_message(is_timeout=True)
 
-                        # 启动奖励任务
-                        self.timeout_award_task = asyncio.create_task(
-                            self._award_timeout_winner(
-                                timed_out_seed, collection_window, timeout_round_id
-                            )
+                    # 启动奖励任务
+                    self.timeout_award_task = asyncio.create_task(
+                        self._award_timeout_winner(
+                            timed_out_seed, collection_window, timeout_round_id
                         )
+                    )
 
-                        # 重新启动超时检查
-                        # 注意：不能调用 start_timeout_checker()，因为它会
-                        # 对 self.timeout_task（即当前任务）调用 cancel()，
-                        # 导致 CancelledError 在锁外的 broadcast_raw() 处触发，
-                        # 使广播被静默丢弃。直接创建新任务即可，当前任务
-                        # 会在广播完成后自然退出。
-                        self.timeout_task = asyncio.create_task(self._check_timeout())
-
-                    # 锁外：广播重置通知（O(N) I/O 不阻塞锁）
-                    await self.broadcast_raw(reset_msg)
-                    return
+                # 锁外：广播重置通知（O(N) I/O 不阻塞锁）
+                await self.broadcast_raw(reset_msg)
 
-        except asyncio.CancelledError:
-            # 任务被取消（正常情况：puzzle被解出）
-            pass
-        except Exception as e:
-            logger.error("Timeout checker error: %s", e, exc_info=True)
+            except asyncio.CancelledError:
+                # 任务被取消（正常情况：应用关闭）
+                break
+            except Exception as e:
+                logger.error("Timeout checker error: %s", e, exc_info=True)
+                await asyncio.sleep(1.0)  # 避免异常持续发生时空转
 
     async def _award_timeout_winner(
         self, timed_out_seed: str, collection_window: float, timeout_round_id: int
@@ -410,8 +584,7 @@ class SystemState:
         from datetime import datetime as _dt
 
         from src.core.audit import append_to_verify_log
-        from src.core.crypto import generate_invite_code, verify_argon2_solution
-        from src.core.executor import get_process_pool
+        from src.core.crypto import generate_invite_code
         from src.core.webhook import send_webhook_notification
 
         def _count_leading_zeros(hex_hash: str) -> int:
@@ -476,22 +649,14 @@ class SystemState:
                 key=lambda s: (-s["actual_leading_zeros"], s["nonce"]),
             )[:10]
 
-            loop = asyncio.get_running_loop()
-            executor = get_process_pool()
-
             for candidate in candidates:
-                is_valid, _ = await loop.run_in_executor(
-                    executor,
-                    verify_argon2_solution,
+                is_valid, _ = await self.verify_argon2(
                     candidate["nonce"],
                     timed_out_seed,
                     candidate["visitor_id"],
                     candidate["ip"],
                     candidate["hash"],
                     candidate["actual_leading_zeros"],
-                    self.argon2_time_cost,
-                    self.argon2_memory_cost,
-                    self.argon2_parallelism,
                 )
                 if not is_valid:
                     logger.debug(
@@ -520,20 +685,19 @@ class SystemState:
                     invite_code,
                 )
 
+                # 经该连接的发送队列投递，慢连接不会阻塞超时结算
                 ws = candidate.get("websocket")
-                if ws is not None:
-                    try:
-                        await ws.send_text(
-                            json.dumps(
-                                {
-                                    "type": "TIMEOUT_INVITE_CODE",
-                                    "invite_code": invite_code,
-                                    "leading_zeros": candidate["actual_leading_zeros"],
-                                }
-                            )
-                        )
-                    except Exception as e:
-                        logger.warning("Failed to deliver TIMEOUT_INVITE_CODE: %s", e)
+                if ws is not None and not self.send_to_connection(
+                    ws,
+                    json_dumps(
+                        {
+                            "type": "TIMEOUT_INVITE_CODE",
+                            "invite_code": invite_code,
+                            "leading_zeros": candidate["actual_leading_zeros"],
+                        }
+                    ),
+                ):
+                    logger.warning("Failed to deliver TIMEOUT_INVITE_CODE (connection gone)")
 
                 asyncio.create_task(
                     append_to_verify_log(
@@ -566,19 +730,271 @@ class SystemState:
                 self.timeout_award_task = None
             self._clear_timeout_window_state(timeout_round_id)
 
-    async def _broadcast(self, message: str) -> None:
-        """并行广播消息给所有连接的客户端，清理断开的连接"""
-        connections_snapshot = list(self.active_connections)
-        tasks = [conn.send_text(message) for conn in connections_snapshot]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        disconnected = {
-            conn
-            for conn, result in zip(connections_snapshot, results)
-            if isinstance(result, Exception)
-        }
-        self.active_connections -= disconnected
-        if disconnected:
-            logger.debug("Removed %d disconnected connections", len(disconnected))
+    def update_argon2(
+        self,
+        time_cost: Optional[int] = None,
+        memory_cost: Optional[int] = None,
+        parallelism: Optional[int] = None,
+        concurrency: Optional[int] = None,
+    ) -> None:
+        """
+        一次性更新 Argon2 参数（在原子锁内调用，调用方负责校验取值）
+
+        参数随每次验证显式传入进程池，无需重建任何哈希对象；
+        memory_cost / parallelism 变化时同步调整验证并发上限（在途验证仍释放旧信号量）。
+
+        Args:
+            concurrency: 按新参数预先算好的验证并发上限（argon2_concurrency_limit 需读文件，
+                应在锁外经 asyncio.to_thread 计算后传入；未提供时在此同步计算）
+        """
+        if time_cost is not None:
+            self.argon2_time_cost = time_cost
+        resize = False
+        if memory_cost is not None and memory_cost != self.argon2_memory_cost:
+            self.argon2_memory_cost = memory_cost
+            resize = True
+        if parallelism is not None and parallelism != self.argon2_parallelism:
+            self.argon2_parallelism = parallelism
+            resize = True
+        if resize:
+            if concurrency is None:
+                concurrency = argon2_concurrency_limit(
+                    self.argon2_memory_cost, self.argon2_parallelism
+                )
+            logger.debug("Argon2 verification concurrency limit: %d", concurrency)
+            self._argon2_sem = asyncio.Semaphore(concurrency)
+
+    async def verify_argon2(
+        self,
+        nonce: int,
+        seed: str,
+        visitor_id: str,
+        ip: str,
+        submitted_hash: str,
+        difficulty: int,
+    ) -> tuple[bool, Optional[str]]:
+        """
+        在进程池中验证 Argon2 解（不阻塞事件循环）
+
+        使用当前 Argon2 参数；信号量限制同时在途的验证数量，
+        防止验证风暴占满进程池、拖慢广播与算力上报。
+
+        Returns:
+            (is_valid, error_message)
+        """
+        async with self._argon2_sem:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                get_process_pool(),
+                verify_argon2_solution,
+                nonce,
+                seed,
+                visitor_id,
+                ip,
+                submitted_hash,
+                difficulty,
+                self.argon2_time_cost,
+                self.argon2_memory_cost,
+                self.argon2_parallelism,
+            )
+
+    def add_connection(self, ws: WebSocket, ip: str) -> None:
+        """注册矿工 WebSocket 连接并启动其写协程"""
+        self.active_connections[ws] = ConnMeta(ip=ip, connected_at=time.monotonic())
+        self._active_snapshot = None
+        self._start_writer(ws)
+        # 新连接需要尽快收到一次全网算力
+        self._last_hashrate_stats = None
+
+    def remove_connection(self, ws: WebSocket) -> None:
+        """移除矿工 WebSocket 连接（连同算力数据）并停止其写协程"""
+        # 仅在成员确实变化时使快照失效：写失败已先行移除的连接，
+        # 在 WebSocket 处理器收尾时再次移除不会触发额外的 O(N) 快照重建
+        if self.active_connections.pop(ws, None) is not None:
+            self._active_snapshot = None
+        if self._unlist_miner(ws):
+            self._hashrate_changed.set()
+        self._stop_writer(ws)
+
+    def clear_connections(self) -> None:
+        """移除所有矿工 WebSocket 连接（Admin 连接不受影响）"""
+        for ws in self.active_connections:
+            self._stop_writer(ws)
+        self.active_connections.clear()
+        self._live_miners.clear()
+        self._live_total = 0.0
+        self._active_snapshot = None
+
+    def add_admin_connection(self, ws: WebSocket) -> None:
+        """注册 Admin WebSocket 连接并启动其写协程"""
+        self.admin_connections.add(ws)
+        self._admin_snapshot = None
+        self._start_writer(ws)
+
+    def remove_admin_connection(self, ws: WebSocket) -> None:
+        """移除 Admin WebSocket 连接并停止其写协程"""
+        if ws in self.admin_connections:
+            self.admin_connections.remove(ws)
+            self._admin_snapshot = None
+        self._stop_writer(ws)
+
+    def _drop_connection(self, ws: WebSocket) -> None:
+        """从矿工与 Admin 集合中移除连接（写失败或消费过慢时调用）"""
+        # 单次 O(1) 清理：只有所属集合的快照失效
+        self.remove_connection(ws)
+        self.remove_admin_connection(ws)
+
+    def active_connections_view(self) -> tuple:
+        """矿工连接的不可变快照，仅在成员变化后重建"""
+        snap = self._active_snapshot
+        if snap is None:
+            snap = self._active_snapshot = tuple(self.active_connections)
+        return snap
+
+    def admin_connections_view(self) -> tuple:
+        """Admin 连接的不可变快照，仅在成员变化后重建"""
+        snap = self._admin_snapshot
+        if snap is None:
+            snap = self._admin_snapshot = tuple(self.admin_connections)
+        return snap
+
+    def session_websockets_view(self) -> tuple:
+        """当前持有有效 Session 的 WebSocket 快照（来自反向索引，无需遍历全部会话）"""
+        return tuple(self._tokens_by_ws)
+
+    def _start_writer(self, ws: WebSocket) -> None:
+        """为连接创建发送队列与专属写协程（广播只入队，不逐连接 await）"""
+        if ws in self._send_queues:
+            return
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.send_queue_size)
+        self._send_queues[ws] = queue
+        self._writer_tasks[ws] = asyncio.create_task(self._writer_loop(ws, queue))
+
+    def _stop_writer(self, ws: WebSocket) -> None:
+        """丢弃连接的发送队列并取消写协程"""
+        self._send_queues.pop(ws, None)
+        self._pending_latest.pop(ws, None)
+        task = self._writer_tasks.pop(ws, None)
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+
+    async def _writer_loop(self, ws: WebSocket, queue: asyncio.Queue) -> None:
+        """连接专属写协程：按序发送队列中的消息，发送失败即视为连接已断开"""
+        try:
+            pending = self._pending_latest
+            while True:
+                event = await queue.get()
+                if event is None:  # drain_writer 投递的结束标记
+                    break
+                await ws.send(event)
+                if queue.empty():
+                    latest = pending.pop(ws, None)
+                    if latest is not None:
+                        await ws.send(latest)
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            self._drop_connection(ws)
+            logger.debug("Removed 1 disconnected connection")
+
+    async def stop_writers(self) -> None:
+        """取消全部连接（含 Admin）的写协程并等待其退出（应用关闭时调用）"""
+        tasks = list(self._writer_tasks.values())
+        self._writer_tasks.clear()
+        self._send_queues.clear()
+        self._pending_latest.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def drain_writer(self, ws: WebSocket, timeout: float = 2.0) -> None:
+        """
+        发送完已入队的消息后停止连接的写协程（用于主动关闭连接前）
+
+        返回后该连接不再有写协程，调用方可直接 send / close 而不会与其并发发送；
+        后续广播也不会再投递到该连接。队列已满或超时则直接取消写协程。
+        """
+        queue = self._send_queues.pop(ws, None)
+        task = self._writer_tasks.pop(ws, None)
+        self._pending_latest.pop(ws, None)
+        if queue is None or task is None or task.done():
+            return
+        try:
+            queue.put_nowait(None)
+        except asyncio.QueueFull:
+            task.cancel()
+        try:
+            await asyncio.wait_for(task, timeout)  # 超时会取消写协程
+        except asyncio.TimeoutError:
+            pass
+
+    async def _close_slow_connection(self, ws: WebSocket) -> None:
+        """关闭发送队列已满（消费过慢）的连接"""
+        try:
+            await ws.close(code=1013, reason="Connection too slow")
+        except Exception:
+            pass
+
+    def _broadcast_text(
+        self, connections: tuple, text: str, droppable: bool = False
+    ) -> None:
+        """
+        广播文本消息给指定连接集合（仅入队，由各连接的写协程发送）
+
+        ASGI 发送事件只构建一次，所有连接共享同一个 dict；
+        广播本身为 O(N) 次 put_nowait，不创建任务、不等待任何连接。
+
+        Args:
+            connections: 目标连接快照（active_connections_view / admin_connections_view）
+            text: 预序列化的 JSON 字符串
+            droppable: 非关键消息（如算力统计）队列满时只保留最新一条，
+                待队列排空后补发（不挤掉已入队的消息）；关键消息队列满时断开该慢连接
+        """
+        if not connections:
+            return
+
+        event = {"type": "websocket.send", "text": text}
+        slow = []
+        for conn in connections:
+            queue = self._send_queues.get(conn)
+            if queue is None:
+                continue
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                if droppable:
+                    self._pending_latest[conn] = event
+                else:
+                    slow.append(conn)
+
+        for conn in slow:
+            self._drop_connection(conn)
+            asyncio.create_task(self._close_slow_connection(conn))
+        if slow:
+            logger.warning("Disconnected %d slow connection(s) (send queue full)", len(slow))
+
+    def send_to_connection(self, ws: WebSocket, text: str) -> bool:
+        """
+        向单个连接投递消息（入队，由其写协程发送）
+
+        Returns:
+            True 如果已入队；连接不存在或队列已满（慢连接被断开）时返回 False
+        """
+        return self.send_event_to_connection(ws, {"type": "websocket.send", "text": text})
+
+    def send_event_to_connection(self, ws: WebSocket, event: dict) -> bool:
+        """向单个连接投递预构建的 ASGI 发送事件（可在多个连接间共享），返回值同 send_to_connection"""
+        queue = self._send_queues.get(ws)
+        if queue is None:
+            return False
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self._drop_connection(ws)
+            asyncio.create_task(self._close_slow_connection(ws))
+            logger.warning("Disconnected 1 slow connection(s) (send queue full)")
+            return False
+        return True
 
     def get_puzzle_reset_message(
         self,
@@ -596,19 +1012,78 @@ class SystemState:
             "puzzle_start_time": self.puzzle_start_time,
             "is_timeout": is_timeout,
         }
-        return json.dumps(msg)
+        return json_dumps(msg)
+
+    def get_puzzle_json(self) -> str:
+        """
+        构建 /puzzle 响应的 JSON 字符串（字段同 PuzzleResponse）
+
+        谜题或参数（含管理员直接修改的字段）任一变化时重新序列化，
+        否则所有请求复用同一份结果。
+        """
+        key = (
+            self.current_seed,
+            self.difficulty,
+            self.argon2_memory_cost,
+            self.argon2_time_cost,
+            self.argon2_parallelism,
+            self.worker_count,
+            self.puzzle_start_time,
+            self.last_solve_time,
+            self._sh_count,
+            self._sh_sum,
+        )
+        if self._puzzle_json is not None and self._puzzle_key == key:
+            return self._puzzle_json
+
+        self._puzzle_json = json_dumps(
+            {
+                "seed": self.current_seed,
+                "difficulty": self.difficulty,
+                "memory_cost": self.argon2_memory_cost,
+                "time_cost": self.argon2_time_cost,
+                "parallelism": self.argon2_parallelism,
+                "worker_count": self.worker_count,
+                "puzzle_start_time": self.puzzle_start_time,
+                "last_solve_time": self.last_solve_time,
+                "average_solve_time": self.average_solve_time,
+            }
+        )
+        self._puzzle_key = key
+        return self._puzzle_json
 
     async def broadcast_raw(self, message: str) -> None:
         """广播预构建的消息字符串给所有连接的客户端（在锁外调用）"""
-        await self._broadcast(message)
+        self._broadcast_text(self.active_connections_view(), message)
 
     async def broadcast_puzzle_reset(self):
-        """广播 puzzle 重置通知给所有连接的客户端（并行发送）"""
-        await self._broadcast(self.get_puzzle_reset_message())
+        """广播 puzzle 重置通知给所有连接的客户端"""
+        self._broadcast_text(self.active_connections_view(), self.get_puzzle_reset_message())
 
     async def broadcast_network_hashrate(self, stats: Dict[str, float]):
-        """广播全网算力统计给所有连接的客户端（并行发送）"""
-        message = json.dumps(
+        """
+        广播全网算力统计给所有连接的客户端（队列满时只保留最新一条统计，排空后补发）
+
+        无连接时直接跳过；算力变化不足 1% 且矿工数不变时也跳过，
+        但每 hashrate_force_every 个周期强制广播一次。
+        """
+        if not self.active_connections:
+            return
+        total = stats["total_hashrate"]
+        miners = stats["active_miners"]
+        last = self._last_hashrate_stats
+        changed = (
+            last is None
+            or last[1] != miners
+            or abs(total - last[0]) > 0.01 * last[0]
+        )
+        if not changed and self._hashrate_skipped_ticks + 1 < self.hashrate_force_every:
+            self._hashrate_skipped_ticks += 1
+            return
+        self._last_hashrate_stats = (total, miners)
+        self._hashrate_skipped_ticks = 0
+
+        message = json_dumps(
             {
                 "type": "NETWORK_HASHRATE",
                 "total_hashrate": round(stats["total_hashrate"], 2),
@@ -616,62 +1091,67 @@ class SystemState:
                 "timestamp": time.time(),
             }
         )
-        await self._broadcast(message)
+        self._broadcast_text(self.active_connections_view(), message, droppable=True)
 
-    async def update_client_hashrate(
-        self, ws: WebSocket, rate: float, client_ip: str
-    ) -> None:
+    def _unlist_miner(self, ws: WebSocket) -> bool:
+        """将矿工移出全网算力统计，返回其此前是否被计入"""
+        meta = self._live_miners.pop(ws, None)
+        if meta is None:
+            return False
+        if self._live_miners:
+            self._live_total -= meta.rate
+        else:
+            self._live_total = 0.0  # 清零以消除累计的浮点误差
+        return True
+
+    def update_client_hashrate(self, ws: WebSocket, rate: float) -> None:
         """更新客户端算力数据"""
-        existing = self.client_hashrates.get(ws) or self.overspeed_hashrates.get(ws)
-        connected_at = existing["connected_at"] if existing else time.time()
-        self.client_hashrates[ws] = {
-            "rate": rate,
-            "timestamp": time.time(),
-            "ip": client_ip,
-            "connected_at": connected_at,
-        }
+        meta = self.active_connections.get(ws)
+        if meta is None:
+            return
+        live = self._live_miners
+        if ws in live:
+            self._live_total -= meta.rate
+            live.move_to_end(ws)  # 保持按上报时间排序
+        else:
+            live[ws] = meta
+            self._hashrate_changed.set()  # 新矿工计入全网算力
+        self._live_total += rate
+        meta.rate = rate
+        meta.last_seen = time.monotonic()
         # 若曾被记为超速，清除（当前报告已合法）
-        self.overspeed_hashrates.pop(ws, None)
+        meta.overspeed = False
 
-    async def update_overspeed_hashrate(
-        self, ws: WebSocket, rate: float, client_ip: str
-    ) -> None:
-        """记录上报算力超过速度限制的矿工"""
-        existing = self.client_hashrates.get(ws) or self.overspeed_hashrates.get(ws)
-        connected_at = existing["connected_at"] if existing else time.time()
-        self.overspeed_hashrates[ws] = {
-            "rate": rate,
-            "timestamp": time.time(),
-            "ip": client_ip,
-            "connected_at": connected_at,
-        }
-
-    def remove_client_hashrate(self, ws: WebSocket) -> None:
-        """客户端断开时移除算力数据"""
-        self.client_hashrates.pop(ws, None)
-        self.overspeed_hashrates.pop(ws, None)
+    def update_overspeed_hashrate(self, ws: WebSocket, rate: float) -> None:
+        """记录上报算力超过速度限制的矿工（不计入全网算力）"""
+        meta = self.active_connections.get(ws)
+        if meta is None:
+            return
+        if self._unlist_miner(ws):
+            self._hashrate_changed.set()  # 矿工移出全网算力
+        meta.rate = rate
+        meta.last_seen = time.monotonic()
+        meta.overspeed = True
 
     def get_network_hashrate(self) -> Dict[str, float]:
         """计算全网算力（过滤过时数据）"""
-        current_time = time.time()
-        active_rates = []
-        stale_connections = []
-
-        for ws, data in list(self.client_hashrates.items()):
-            age = current_time - data["timestamp"]
-            if age <= self.hashrate_stale_timeout:
-                active_rates.append(data["rate"])
-            else:
-                stale_connections.append(ws)
-
-        # 清理过时数据
-        for ws in stale_connections:
-            self.client_hashrates.pop(ws, None)
+        cutoff = time.monotonic() - self.hashrate_stale_timeout
+        live = self._live_miners
+        stale = 0
+
+        # 队首即最久未上报的矿工，逐个清理直到遇到未过时的条目
+        while live:
+            ws, meta = next(iter(live.items()))
+            if meta.last_seen >= cutoff:
+                break
+            self._unlist_miner(ws)
+            meta.last_seen = None
+            stale += 1
 
         return {
-            "total_hashrate": sum(active_rates),
-            "active_miners": len(active_rates),
-            "stale_removed": len(stale_connections),
+            "total_hashrate": self._live_total,
+            "active_miners": len(live),
+            "stale_removed": stale,
         }
 
     async def start_hashrate_aggregation(self) -> None:
@@ -680,26 +1160,48 @@ class SystemState:
             return
 
         async def aggregation_loop():
+            interval = 5.0  # 图表采样周期
+            min_gap = 1.0  # 事件触发广播的最小间隔（合并重连风暴中的多次变化）
+            changed = self._hashrate_changed
+            next_tick = time.monotonic() + interval
+            last_run = 0.0
             while True:
                 try:
-                    await asyncio.sleep(5.0)  # 每5秒
+                    # 等待矿工增减事件或下一个 5 秒周期，以先到者为准
+                    timeout = next_tick - time.monotonic()
+                    if timeout > 0:
+                        try:
+                            await asyncio.wait_for(changed.wait(), timeout)
+                        except asyncio.TimeoutError:
+                            pass
+                    gap = last_run + min_gap - time.monotonic()
+                    if gap > 0:
+                        await asyncio.sleep(gap)
+                    changed.clear()
+
+                    now = time.monotonic()
+                    last_run = now
                     stats = self.get_network_hashrate()
 
-                    # 追加算力历史（供管理面板图表使用）
-                    self.hashrate_chart_history.append(
-                        round(stats["total_hashrate"], 2)
-                    )
-                    if len(self.hashrate_chart_history) > self.chart_history_max:
-                        self.hashrate_chart_history.pop(0)
-
-                    logger.debug(
-                        "Network hashrate: %.2f H/s | active miners: %d | stale removed: %d",
-                        stats["total_hashrate"],
-                        stats["active_miners"],
-                        stats["stale_removed"],
-                    )
+                    if now >= next_tick:
+                        next_tick = now + interval
+                        # 追加算力历史（供管理面板图表使用，仅按周期采样）
+                        self.hashrate_chart_history.append(
+                            round(stats["total_hashrate"], 2)
+                        )
+                        if len(self.hashrate_chart_history) > self.chart_history_max:
+                            self.hashrate_chart_history.pop(0)
+
+                        # 仅在 DEBUG 开启时取参数并进入 logging 调用
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug(
+                                "Network hashrate: %.2f H/s | active miners: %d | stale removed: %d",
+                                stats["total_hashrate"],
+                                stats["active_miners"],
+                                stats["stale_removed"],
+                            )
 
-                    # 广播全网算力到所有连接的客户端
+                    # 广播全网算力到所有连接的客户端（仅入队，慢连接只保留最新统计）
                     await self.broadcast_network_hashrate(stats)
                 except asyncio.CancelledError:
                     logger.debug("Hashrate aggregation task cancelled")
@@ -731,14 +1233,9 @@ class SystemState:
             生成的 256 位随机 Token
         """
         token = secrets.token_urlsafe(32)  # 生成 256 位随机 Token
-        self.session_tokens[token] = {
-            "websocket": websocket,
-            "ip": ip,
-            "created_at": time.time(),
-            "disconnected_at": None,
-            "is_connected": True,
-            "visitor_id": None,
-        }
+        self.session_tokens[token] = Session(websocket, ip, time.time())
+        self._tokens_by_ip.setdefault(ip, set()).add(token)
+        self._tokens_by_ws.setdefault(websocket, set()).add(token)
         logger.info(
             "Session token generated for IP %s (total sessions: %d)",
             ip,
@@ -757,30 +1254,29 @@ class SystemState:
         Returns:
             True 如果 Token 有效且 IP 匹配，否则 False
         """
-        if token not in self.session_tokens:
+        token_data = self.session_tokens.get(token)
+        if token_data is None:
             return False
 
-        token_data = self.session_tokens[token]
-
         # 检查是否已被吊销
-        if token_data.get("revoked"):
-            logger.debug("Token revoked (IP: %s)", token_data["ip"])
+        if token_data.revoked:
+            logger.debug("Token revoked (IP: %s)", token_data.ip)
             return False
 
         # 验证 IP 一致性
-        if token_data["ip"] != request_ip:
+        if token_data.ip != request_ip:
             logger.debug(
                 "Token IP mismatch: token_ip=%s, request_ip=%s",
-                token_data["ip"],
+                token_data.ip,
                 request_ip,
             )
             return False
 
         # 检查是否已过期（未连接超过5分钟）
-        if not token_data["is_connected"]:
-            disconnected_at = token_data.get("disconnected_at")
+        if not token_data.is_connected:
+            disconnected_at = token_data.disconnected_at
             if disconnected_at is not None:
-                time_since_disconnect = time.time() - disconnected_at
+                time_since_disconnect = time.monotonic() - disconnected_at
                 if time_since_disconnect > self.token_expiry_seconds:
                     logger.debug(
                         "Token expired (disconnected %.1fs > %ds)",
@@ -799,13 +1295,18 @@ class SystemState:
         Args:
             websocket: 要标记 Token 的 WebSocket 连接
         """
-        # 找到该 WebSocket 对应的所有 Token
-        for token, data in list(self.session_tokens.items()):
-            if data["websocket"] == websocket:
+        # 通过反向索引找到该 WebSocket 对应的所有 Token
+        for token in self._tokens_by_ws.pop(websocket, ()):
+            data = self.session_tokens.get(token)
+            if data is not None and data.websocket is websocket:
                 # 标记为未连接
-                data["is_connected"] = False
-                data["disconnected_at"] = time.time()
-                data["websocket"] = None  # 清除 WebSocket 引用，避免内存泄漏
+                data.is_connected = False
+                data.disconnected_at = time.monotonic()
+                data.websocket = None  # 清除 WebSocket 引用，避免内存泄漏
+                heapq.heappush(
+                    self._expiry_heap,
+                    (data.disconnected_at + self.token_expiry_seconds, token),
+                )
                 logger.debug(
                     "Token marked disconnected (will expire in 5min, remaining: %d)",
                     len(self.session_tokens),
@@ -822,15 +1323,50 @@ class SystemState:
         Returns:
             True 如果成功重连，False 如果 Token 不存在
         """
-        if token not in self.session_tokens:
+        token_data = self.session_tokens.get(token)
+        if token_data is None:
             return False
+        if token_data.websocket is not None:
+            self._unindex_websocket(token, token_data.websocket)
+        token_data.websocket = websocket
+        self._tokens_by_ws.setdefault(websocket, set()).add(token)
+        token_data.is_connected = True
+        token_data.disconnected_at = None
+
+        logger.info("Session token reconnected (IP: %s)", token_data.ip)
+        return True
 
-        token_data = self.session_tokens[token]
-        token_data["websocket"] = websocket
-        token_data["is_connected"] = True
-        token_data["disconnected_at"] = None
+    def _unindex_websocket(self, token: str, websocket: WebSocket) -> None:
+        """从 WebSocket 反向索引中移除 Token"""
+        ws_tokens = self._tokens_by_ws.get(websocket)
+        if ws_tokens is not None:
+            ws_tokens.discard(token)
+            if not ws_tokens:
+                del self._tokens_by_ws[websocket]
 
-        logger.info("Session token reconnected (IP: %s)", token_data["ip"])
+    def revoke_token(self, token: str, data: Optional[Session] = None) -> bool:
+        """
+        吊销单个 Session Token（标记为已吊销，由清理任务回收）
+
+        Args:
+            token: 要吊销的 Token
+            data: 已查到的 Session（可选，避免重复查表）
+
+        Returns:
+            True 如果 Token 存在，否则 False
+        """
+        if data is None:
+            data = self.session_tokens.get(token)
+            if data is None:
+                return False
+        if data.websocket is not None:
+            self._unindex_websocket(token, data.websocket)
+        data.revoked = True
+        data.is_connected = False
+        data.disconnected_at = time.monotonic()
+        data.websocket = None
+        # 已吊销的 Token 在下一次清理时立即回收
+        heapq.heappush(self._expiry_heap, (data.disconnected_at, token))
         return True
 
     def revoke_tokens_by_ip(self, ip: str) -> int:
@@ -848,12 +1384,10 @@ class SystemState:
             吊销的 Token 数量
         """
         revoked = 0
-        for token, data in list(self.session_tokens.items()):
-            if data.get("ip") == ip and not data.get("revoked"):
-                data["revoked"] = True
-                data["is_connected"] = False
-                data["disconnected_at"] = time.time()
-                data["websocket"] = None
+        for token in self._tokens_by_ip.get(ip, ()):
+            data = self.session_tokens[token]
+            if not data.revoked:
+                self.revoke_token(token, data)
                 revoked += 1
         if revoked:
             logger.info("Revoked %d token(s) for IP %s", revoked, ip)
@@ -868,14 +1402,19 @@ class SystemState:
         Returns:
             吊销的 Token 数量
         """
+        now = time.monotonic()
         revoked = 0
-        for token, data in list(self.session_tokens.items()):
-            if not data.get("revoked"):
-                data["revoked"] = True
-                data["is_connected"] = False
-                data["disconnected_at"] = time.time()
-                data["websocket"] = None
+        for data in self.session_tokens.values():
+            if not data.revoked:
+                data.revoked = True
+                data.is_connected = False
+                data.disconnected_at = now
+                data.websocket = None
                 revoked += 1
+        self._tokens_by_ws.clear()
+        # 所有 Token 均已吊销，过期堆整体重建为「立即回收」，一次 heapify 代替逐个入堆
+        self._expiry_heap = [(now, token) for token in self.session_tokens]
+        heapq.heapify(self._expiry_heap)
         if revoked:
             logger.info("Revoked all %d token(s)", revoked)
         return revoked
@@ -922,29 +1461,49 @@ class SystemState:
         Returns:
             清理的 Token 数量
         """
-        current_time = time.time()
-        tokens_to_remove = []
-
-        for token, data in list(self.session_tokens.items()):
-            # 清理已吊销的 Token
-            if data.get("revoked"):
-                tokens_to_remove.append(token)
+        current_time = time.monotonic()
+        heap = self._expiry_heap
+        expired: Dict[str, Session] = {}
+
+        # 只弹出已到期的条目；重连或重复入堆留下的过时条目直接丢弃
+        while heap and heap[0][0] <= current_time:
+            expires_at, token = heapq.heappop(heap)
+            data = self.session_tokens.get(token)
+            if data is None or token in expired:
+                continue
+            if not data.revoked and (
+                data.is_connected
+                or data.disconnected_at is None
+                or data.disconnected_at + self.token_expiry_seconds != expires_at
+            ):
                 continue
+            expired[token] = data
+
+        if not expired:
+            return 0
 
-            # 清理未连接且超时的 Token
-            if not data["is_connected"]:
-                disconnected_at = data.get("disconnected_at")
-                if disconnected_at is not None:
-                    time_since_disconnect = current_time - disconnected_at
-                    # 超过5分钟未连接，标记为待删除
-                    if time_since_disconnect > self.token_expiry_seconds:
-                        tokens_to_remove.append(token)
+        # 大批量过期（超过 1/4）时整体重建字典，否则逐个删除
+        if len(expired) > len(self.session_tokens) // 4:
+            self.session_tokens = {
+                token: data
+                for token, data in self.session_tokens.items()
+                if token not in expired
+            }
+        else:
+            for token in expired:
+                del self.session_tokens[token]
 
-        # 批量删除过期 Token
-        for token in tokens_to_remove:
-            del self.session_tokens[token]
+        # 同步维护反向索引
+        for token, data in expired.items():
+            ip_tokens = self._tokens_by_ip.get(data.ip)
+            if ip_tokens is not None:
+                ip_tokens.discard(token)
+                if not ip_tokens:
+                    del self._tokens_by_ip[data.ip]
+            if data.websocket is not None:
+                self._unindex_websocket(token, data.websocket)
 
-        return len(tokens_to_remove)
+        return len(expired)
 
     def get_status_snapshot(self) -> dict:
         """返回可序列化的全量系统状态快照"""
@@ -963,7 +1522,7 @@ class SystemState:
             "mining_time": round(self.get_current_mining_time(), 2),
             "is_mining_active": self.is_mining_active,
             "last_solve_time": self.last_solve_time,
-            "solve_history": list(self.solve_history),
+            "solve_history": self._solve_history_list(),
             "average_solve_time": self.average_solve_time,
             "active_miners": len(self.active_miners),
             "active_connections": len(self.active_connections),
@@ -973,92 +1532,163 @@ class SystemState:
             "argon2_parallelism": self.argon2_parallelism,
             "worker_count": self.worker_count,
             "max_nonce_speed": self.max_nonce_speed,
-            "banned_ips_count": len(self.banned_ips),
+            "banned_ips_count": self.banned_count(),
             "hashrate_chart_history": list(self.hashrate_chart_history),
             "solve_time_chart_history": list(self.solve_time_chart_history),
         }
 
-    def get_miners_info(self) -> list:
-        """从 client_hashrates 提取矿工列表（含超速矿工）"""
-        current_time = time.time()
-        miners = []
-        seen_ws = set()
-
-        for ws, data in list(self.client_hashrates.items()):
-            age = current_time - data.get("timestamp", current_time)
-            if age > self.hashrate_stale_timeout:
-                continue
-            seen_ws.add(ws)
-            miners.append(
-                {
-                    "ip": data.get("ip", "unknown"),
-                    "hashrate": round(data.get("rate", 0), 2),
-                    "last_seen": round(age, 1),
-                    "connected_since": round(
-                        current_time - data.get("connected_at", current_time)
-                    ),
-                    "overspeed": False,
-                }
-            )
+    def get_status_update_message(self) -> str:
+        """
+        构建 Admin STATUS_UPDATE 消息的 JSON 字符串
 
-        for ws, data in self.overspeed_hashrates.items():
-            if ws in seen_ws:
-                continue  # 已在正常列表（不应发生，防御性检查）
-            age = current_time - data.get("timestamp", current_time)
-            if age > self.hashrate_stale_timeout:
-                continue
-            miners.append(
-                {
-                    "ip": data.get("ip", "unknown"),
-                    "hashrate": round(data.get("rate", 0), 2),
-                    "last_seen": round(age, 1),
-                    "connected_since": round(
-                        current_time - data.get("connected_at", current_time)
-                    ),
-                    "overspeed": True,
-                }
-            )
+        同一秒内的调用复用同一份序列化结果，M 个 Admin 连接只需构建一次快照；
+        puzzle 重置与记录解题时间时缓存失效。
+        """
+        bucket = int(time.monotonic())
+        if self._status_msg is not None and self._status_msg_key == bucket:
+            return self._status_msg
+
+        snapshot = self.get_status_snapshot()
+        network = self.get_network_hashrate()
+        snapshot["total_hashrate"] = round(network["total_hashrate"], 2)
+        self._status_msg = json_dumps({"type": "STATUS_UPDATE", **snapshot})
+        self._status_event = {"type": "websocket.send", "text": self._status_msg}
+        self._status_msg_key = bucket
+        return self._status_msg
+
+    def get_status_update_event(self) -> dict:
+        """STATUS_UPDATE 的 ASGI 发送事件（与消息同步缓存，多个 Admin 连接共享）"""
+        self.get_status_update_message()
+        return self._status_event
 
-        return miners
+    def get_miners_info(self) -> list:
+        """从 active_connections 提取近期上报过算力的矿工列表（含超速矿工）"""
+        current_time = time.monotonic()
+        cutoff = current_time - self.hashrate_stale_timeout
+        # 单次推导式完成过滤与构建（未上报 / 已过时的 last_seen 为 None 或早于 cutoff）
+        return [
+            {
+                "ip": meta.ip,
+                "hashrate": round(meta.rate, 2),
+                "last_seen": round(current_time - meta.last_seen, 1),
+                "connected_since": round(current_time - meta.connected_at),
+                "overspeed": meta.overspeed,
+            }
+            for meta in self.active_connections.values()
+            if meta.last_seen is not None and meta.last_seen >= cutoff
+        ]
 
     def get_sessions_info(self) -> list:
         """从 session_tokens 提取会话列表（去除 WebSocket 引用）"""
-        sessions = []
-        for token_str, data in list(self.session_tokens.items()):
-            sessions.append(
-                {
-                    "token_preview": token_str[:8] + "...",
-                    "ip": data.get("ip", "unknown"),
-                    "created_at": data.get("created_at"),
-                    "is_connected": data.get("is_connected", False),
-                    "disconnected_at": data.get("disconnected_at"),
-                }
-            )
-        return sessions
+        # disconnected_at 内部为单调时钟，对外换算为 Unix 时间戳
+        wall_offset = time.time() - time.monotonic()
+        return [
+            {
+                "token_preview": token_str[:8] + "...",
+                "ip": data.ip,
+                "created_at": data.created_at,
+                "is_connected": data.is_connected,
+                "disconnected_at": (
+                    data.disconnected_at + wall_offset
+                    if data.disconnected_at is not None
+                    else None
+                ),
+            }
+            for token_str, data in self.session_tokens.items()
+        ]
+
+    def _add_ban(self, entry: str) -> bool:
+        """写入单条黑名单（IP 或 CIDR），返回是否为新增"""
+        cidr = _parse_ban_entry(entry)
+        if cidr is not None:
+            version, prefixlen, network = cidr
+            nets = self._banned_networks.setdefault((version, prefixlen), set())
+            if network in nets:
+                return False
+            nets.add(network)
+            return True
+        key = _ip_key(entry.split("/", 1)[0])
+        if key in self.banned_ips:
+            return False
+        self.banned_ips.add(key)
+        return True
+
+    def banned_count(self) -> int:
+        """黑名单条目总数（单 IP + CIDR 段）"""
+        return len(self.banned_ips) + sum(
+            len(nets) for nets in self._banned_networks.values()
+        )
+
+    def _blacklist_changed(self) -> None:
+        """黑名单变更后清空排序缓存，并标记待持久化"""
+        self._banned_sorted = None
+        self._blacklist_dirty = True
 
     def ban_ip(self, ip: str) -> bool:
-        """将 IP 加入黑名单，返回是否为新增"""
-        if ip in self.banned_ips:
+        """将 IP 或 CIDR 段加入黑名单，返回是否为新增"""
+        if not self._add_ban(ip):
             return False
-        self.banned_ips.add(ip)
-        logger.info("Banned IP: %s (total: %d)", ip, len(self.banned_ips))
+        self._blacklist_changed()
+        logger.info("Banned IP: %s (total: %d)", ip, self.banned_count())
         return True
 
     def unban_ip(self, ip: str) -> bool:
-        """将 IP 从黑名单移除，返回是否存在"""
-        if ip not in self.banned_ips:
-            return False
-        self.banned_ips.discard(ip)
-        logger.info("Unbanned IP: %s (total: %d)", ip, len(self.banned_ips))
+        """将 IP 或 CIDR 段从黑名单移除，返回是否存在"""
+        cidr = _parse_ban_entry(ip)
+        if cidr is not None:
+            version, prefixlen, network = cidr
+            nets = self._banned_networks.get((version, prefixlen))
+            if nets is None or network not in nets:
+                return False
+            nets.discard(network)
+            if not nets:
+                del self._banned_networks[(version, prefixlen)]
+        else:
+            key = _ip_key(ip.split("/", 1)[0])
+            if key not in self.banned_ips:
+                return False
+            self.banned_ips.discard(key)
+        self._blacklist_changed()
+        logger.info("Unbanned IP: %s (total: %d)", ip, self.banned_count())
         return True
 
     def is_banned(self, ip: str) -> bool:
-        """检查 IP 是否在黑名单中"""
-        return ip in self.banned_ips
+        """
+        检查 IP 是否在黑名单中
+
+        精确 IP 为 O(1) 集合查询；未命中时逐个前缀长度匹配 CIDR 段
+        （每个前缀长度一次哈希，次数以前缀长度种类数为上限）。
+        不缓存查询结果：IP 来自客户端可控的请求头，轮换地址即可冲刷任何缓存。
+        """
+        key = _ip_key(ip)
+        if key in self.banned_ips:
+            return True
+        if not self._banned_networks or isinstance(key, str):
+            return False
+        if key & _IPV6_TAG:
+            version, addr, bits = 6, key ^ _IPV6_TAG, 128
+        else:
+            version, addr, bits = 4, key, 32
+        for (net_version, prefixlen), nets in self._banned_networks.items():
+            if net_version == version and (addr >> (bits - prefixlen)) in nets:
+                return True
+        return False
 
     def get_banned_ips(self) -> list[str]:
-        """返回黑名单中所有 IP"""
-        return sorted(self.banned_ips)
+        """返回黑名单中所有 IP 与 CIDR 段（排序结果缓存至下次变更）"""
+        if self._banned_sorted is not None:
+            return self._banned_sorted
+        entries = [_ip_from_key(key) for key in self.banned_ips]
+        for (version, prefixlen), nets in self._banned_networks.items():
+            max_len = 32 if version == 4 else 128
+            network_cls = ipaddress.IPv4Network if version == 4 else ipaddress.IPv6Network
+            for network in nets:
+                entries.append(
+                    str(network_cls((network << (max_len - prefixlen), prefixlen)))
+                )
+        entries.sort()
+        self._banned_sorted = entries
+        return entries
 
     def load_blacklist(self, path: str = "blacklist.json") -> None:
         """从文件加载黑名单（启动时调用）"""
@@ -1066,55 +1696,89 @@ class SystemState:
         if not p.exists():
             return
         try:
-            data = json.loads(p.read_text(encoding="utf-8"))
+            data = json_loads(p.read_bytes())
             if isinstance(data, list):
-                self.banned_ips = set(data)
-                logger.info("Loaded %d banned IPs from %s", len(self.banned_ips), path)
+                self.banned_ips = set()
+                self._banned_networks = {}
+                for entry in data:
+                    # 逐条校验：单条非法条目仅跳过，不影响其余条目加载
+                    try:
+                        if not isinstance(entry, str):
+                            raise TypeError(type(entry).__name__)
+                        ipaddress.ip_network(entry, strict=False)
+                    except (TypeError, ValueError):
+                        logger.warning("Skipping invalid blacklist entry: %r", entry)
+                        continue
+                    self._add_ban(entry)
+                self._banned_sorted = None
+                self._blacklist_dirty = False
+                logger.info("Loaded %d banned IPs from %s", self.banned_count(), path)
         except Exception as e:
             logger.error("Failed to load blacklist from %s: %s", path, e)
 
     async def save_blacklist(self, path: str = "blacklist.json") -> None:
-        """异步将黑名单持久化到文件"""
-        try:
-            content = json.dumps(sorted(self.banned_ips), indent=2, ensure_ascii=False)
-            async with aiofiles.open(path, "w", encoding="utf-8") as f:
-                await f.write(content)
-        except Exception as e:
-            logger.error("Failed to save blacklist to %s: %s", path, e)
+        """
+        异步将黑名单持久化到文件
+
+        自上次保存后未变更则跳过；先写临时文件再原子替换，避免写入中断导致文件损坏。
+        并发调用在锁内排队，快照在锁内获取，保证最后落盘的是最新黑名单。
+        """
+        async with self._blacklist_save_lock:
+            if not self._blacklist_dirty:
+                return
+            self._blacklist_dirty = False
+            tmp_path = f"{path}.tmp"
+            try:
+                data = self.get_banned_ips()
+                content = json_dumps_pretty(data)
+                async with aiofiles.open(tmp_path, "wb") as f:
+                    await f.write(content)
+                await aiofiles.os.replace(tmp_path, path)
+            except Exception as e:
+                self._blacklist_dirty = True
+                logger.error("Failed to save blacklist to %s: %s", path, e)
 
     def has_active_connection(self, ip: str) -> bool:
         """检查该 IP 是否已有活跃 WebSocket 连接"""
-        return ip in self.ip_connections
+        return _ip_key(ip) in self.ip_connections
 
     def register_ip_connection(self, ip: str, ws: WebSocket) -> None:
         """注册 IP 与 WebSocket 的映射"""
-        self.ip_connections[ip] = ws
+        self.ip_connections[_ip_key(ip)] = ws
 
     def unregister_ip_connection(self, ip: str, ws: WebSocket) -> None:
         """取消注册（仅当当前映射的 ws 匹配时才移除，防止误删）"""
-        if self.ip_connections.get(ip) is ws:
-            del self.ip_connections[ip]
+        key = _ip_key(ip)
+        if self.ip_connections.get(key) is ws:
+            del self.ip_connections[key]
 
     def get_ip_connection(self, ip: str) -> Optional[WebSocket]:
         """获取该 IP 当前的活跃 WebSocket"""
-        return self.ip_connections.get(ip)
+        return self.ip_connections.get(_ip_key(ip))
+
+    def get_ip_websockets(self, ip: str) -> list[WebSocket]:
+        """
+        返回该 IP 当前在线的所有矿工 WebSocket
+
+        经 Token 反向索引查找（O(该 IP 的 Token 数)），并补上 IP 连接映射中的连接，
+        不遍历全部连接。
+        """
+        sockets = set()
+        for token in self._tokens_by_ip.get(ip, ()):
+            ws = self.session_tokens[token].websocket
+            if ws is not None:
+                sockets.add(ws)
+        ws = self.get_ip_connection(ip)
+        if ws is not None:
+            sockets.add(ws)
+        return [ws for ws in sockets if ws in self.active_connections]
 
     async def broadcast_to_admins(self, message: dict):
         """广播消息给所有 Admin WebSocket 连接"""
         if not self.admin_connections:
             return
 
-        text = json.dumps(message)
-        connections_snapshot = list(self.admin_connections)
-        tasks = [conn.send_text(text) for conn in connections_snapshot]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        disconnected = set()
-        for conn, result in zip(connections_snapshot, results):
-            if isinstance(result, Exception):
-                disconnected.add(conn)
-
-        self.admin_connections -= disconnected
+        self._broadcast_text(self.admin_connections_view(), json_dumps(message))
 
 
 # 全局单例
@@ -5,6 +5,7 @@ Cloudflare Turnstile 验证模块
 
 import logging
 import os
+from functools import lru_cache
 from typing import Optional, Tuple
 
 import httpx
@@ -36,9 +37,10 @@ async def close_turnstile_client() -> None:
         _http_client = None
 
 
+@lru_cache(maxsize=None)
 def get_turnstile_config() -> Tuple[str, str, bool]:
     """
-    获取 Turnstile 配置
+    获取 Turnstile 配置（首次成功解析后缓存；缺少密钥时抛出的异常不会被缓存）
 
     Returns:
         (site_key, secret_key, test_mode)
@@ -61,6 +63,11 @@ def get_turnstile_config() -> Tuple[str, str, bool]:
     return site_key, secret_key, False
 
 
+def reload_config() -> None:
+    """清除已缓存的 Turnstile 配置，下次调用时重新读取环境变量（测试用）"""
+    get_turnstile_config.cache_clear()
+
+
 async def verify_turnstile_token(
     token: str, remote_ip: Optional[str] = None, secret_key: Optional[str] = None
 ) -> Tuple[bool, Optional[str]]:
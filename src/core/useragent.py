@@ -1,8 +1,15 @@
 import re
+from functools import lru_cache
 from typing import Optional, Tuple
 
-# 已知自动化工具黑名单（编译一次，import 时执行）
-_BOT_PATTERN = re.compile(
+try:
+    import re2  # google-re2：DFA 匹配，保证线性时间（可选依赖）
+except ImportError:  # 未安装时回退到标准库 re
+    re2 = None
+
+# 已知自动化工具黑名单（编译一次，import 时执行）；
+# 纯字面量多选一，优先交给 RE2 以避免回溯，缺失时使用标准库 re
+_BOT_PATTERN = (re2 or re).compile(
     r"(?i)"
     r"(?:curl|wget|python-requests|python-httpx|python-urllib|httpx|"
     r"Go-http-client|Java/|Apache-HttpClient|"
@@ -13,6 +20,7 @@ _BOT_PATTERN = re.compile(
 )
 
 
+@lru_cache(maxsize=1024)
 def validate_user_agent(ua: Optional[str]) -> Tuple[bool, Optional[str]]:
     """
     验证 User-Agent 是否来自真实浏览器
@@ -21,17 +29,19 @@ def validate_user_agent(ua: Optional[str]) -> Tuple[bool, Optional[str]]:
         (is_valid, error_message)
         - (True, None) 表示通过
         - (False, "reason") 表示拒绝
+
+    浏览器 UA 高度重复，结果按 UA 字符串缓存（LRU，有上限）。
     """
     # 1. 拒绝空/缺失 UA
     if not ua or not ua.strip():
         return False, "Missing User-Agent header"
 
-    # 2. 已知自动化工具黑名单
-    if _BOT_PATTERN.search(ua):
-        return False, "Automated client detected"
-
-    # 3. 要求 UA 以 Mozilla/5.0 开头（所有主流浏览器的通用前缀）
+    # 2. 要求 UA 以 Mozilla/5.0 开头（所有主流浏览器的通用前缀，廉价检查优先）
     if not ua.startswith("Mozilla/5.0"):
         return False, "Invalid User-Agent format"
 
+    # 3. 已知自动化工具黑名单（拦截伪装成浏览器前缀的自动化客户端）
+    if _BOT_PATTERN.search(ua):
+        return False, "Automated client detected"
+
     return True, None
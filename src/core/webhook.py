@@ -2,16 +2,37 @@ import asyncio
 import json
 import logging
 import os
-from typing import Optional
+from functools import lru_cache
+from typing import Dict, Optional
 
 import httpx
 
 logger = logging.getLogger(__name__)
 
+_http_client: Optional[httpx.AsyncClient] = None
 
+
+def get_webhook_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(5.0),
+            limits=httpx.Limits(max_keepalive_connections=32),
+        )
+    return _http_client
+
+
+async def close_webhook_client() -> None:
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+@lru_cache(maxsize=None)
 def get_webhook_url() -> Optional[str]:
     """
-    从环境变量获取 Webhook URL
+    从环境变量获取 Webhook URL（首次读取后缓存，运行期间不变）
 
     Returns:
         Webhook URL 或 None（如果未配置）
@@ -20,9 +41,10 @@ def get_webhook_url() -> Optional[str]:
     return url if url else None
 
 
+@lru_cache(maxsize=None)
 def get_webhook_token() -> Optional[str]:
     """
-    从环境变量获取 Webhook Bearer Token
+    从环境变量获取 Webhook Bearer Token（首次读取后缓存，运行期间不变）
 
     Returns:
         Bearer Token 或 None（如果未配置）
@@ -31,6 +53,23 @@ def get_webhook_token() -> Optional[str]:
     return token if token else None
 
 
+@lru_cache(maxsize=None)
+def _get_webhook_headers() -> Dict[str, str]:
+    """构建 Webhook 请求头（配置了 WEBHOOK_TOKEN 时附带 Bearer 鉴权），只构建一次"""
+    headers = {"Content-Type": "application/json"}
+    webhook_token = get_webhook_token()
+    if webhook_token:
+        headers["Authorization"] = f"Bearer {webhook_token}"
+    return headers
+
+
+def reload_config() -> None:
+    """清除已缓存的 Webhook 配置，下次调用时重新读取环境变量（测试用）"""
+    get_webhook_url.cache_clear()
+    get_webhook_token.cache_clear()
+    _get_webhook_headers.cache_clear()
+
+
 async def send_webhook_notification(visitor_id: str, invite_code: str) -> None:
     """
     异步发送 Webhook 通知（用户获胜时触发），失败后最多重试 3 次（指数退避）。
@@ -51,23 +90,18 @@ async def send_webhook_notification(visitor_id: str, invite_code: str) -> None:
 
     payload = {"visitor_id": visitor_id, "invite_code": invite_code}
 
-    # 构建请求头
-    headers = {"Content-Type": "application/json"}
-
-    # 如果配置了 Bearer Token，添加到请求头
-    webhook_token = get_webhook_token()
-    if webhook_token:
-        headers["Authorization"] = f"Bearer {webhook_token}"
+    headers = _get_webhook_headers()
 
+    # 复用长连接客户端（连接池 + Keep-Alive，避免每次重新握手 TLS）
+    client = get_webhook_client()
     max_attempts = 3
     for attempt in range(max_attempts):
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.post(
-                    webhook_url,
-                    json=payload,
-                    headers=headers,
-                )
+            response = await client.post(
+                webhook_url,
+                json=payload,
+                headers=headers,
+            )
 
             if response.status_code == 200:
                 logger.info("Webhook sent successfully -> %s", webhook_url)
@@ -1,22 +1,28 @@
 import ipaddress
-import re
-from typing import Optional
+from typing import Annotated, Optional
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, StringConstraints, field_validator
 
 
-HASH_HEX_RE = re.compile(r"^[0-9a-f]{64}$")
-
-
-def _normalize_hash_hex(value: str) -> str:
-    normalized = value.strip().lower()
-    if not HASH_HEX_RE.fullmatch(normalized):
-        raise ValueError("hash must be a 64-character hex string")
-    return normalized
+# 输入格式约束交给 pydantic-core 校验（去空白、转小写、正则匹配均在 Rust 侧完成），
+# 格式错误的提交在进入 Argon2 进程池之前即被拒绝
+# max_length 让超长输入在正则匹配前即被拒绝
+HexHash = Annotated[
+    str,
+    StringConstraints(
+        strip_whitespace=True, to_lower=True, max_length=64, pattern=r"^[0-9a-fA-F]{64}$"
+    ),
+]
+Seed = Annotated[  # secrets.token_hex(16)
+    str, StringConstraints(max_length=32, pattern=r"^[0-9a-f]{32}$")
+]
+VisitorId = Annotated[
+    str, StringConstraints(max_length=128, pattern=r"^[A-Za-z0-9._-]{1,128}$")
+]
 
 
 class PuzzleRequest(BaseModel):
-    visitorId: str = Field(max_length=128)
+    visitorId: VisitorId
 
 
 class PuzzleResponse(BaseModel):
@@ -31,30 +37,20 @@ class PuzzleResponse(BaseModel):
     average_solve_time: Optional[float] = None
 
 class Submission(BaseModel):
-    visitorId: str = Field(max_length=128)       # ThumbmarkJS 指纹
+    visitorId: VisitorId                         # ThumbmarkJS 指纹
     nonce: int = Field(ge=0, le=2**53)           # 挖矿 nonce
-    submittedSeed: str = Field(max_length=128)   # 提交时的 seed
+    submittedSeed: Seed                          # 提交时的 seed
     traceData: str = Field(max_length=2048)      # Cloudflare trace 数据
-    hash: str = Field(max_length=256)            # 计算出的哈希值
-
-    @field_validator("hash")
-    @classmethod
-    def validate_hash(cls, v: str) -> str:
-        return _normalize_hash_hex(v)
+    hash: HexHash                                # 计算出的哈希值
 
 class BestHashSubmission(BaseModel):
-    visitorId: str = Field(max_length=128)
+    visitorId: VisitorId
     nonce: int = Field(ge=0, le=2**53)
-    submittedSeed: str = Field(max_length=128)
+    submittedSeed: Seed
     traceData: str = Field(max_length=2048)
-    hash: str = Field(max_length=256)
+    hash: HexHash
     leadingZeros: int = Field(ge=0, le=256)
 
-    @field_validator("hash")
-    @classmethod
-    def validate_hash(cls, v: str) -> str:
-        return _normalize_hash_hex(v)
-
 class VerifyResponse(BaseModel):
     invite_code: str
 
@@ -97,13 +93,15 @@ class AdminKickRequest(BaseModel):
         return v
 
 class AdminUnbanRequest(BaseModel):
-    ip: str
+    ip: str  # IP 或 CIDR 段
 
     @field_validator("ip")
     @classmethod
     def validate_ip(cls, v: str) -> str:
+        # 返回规范化形式（与 get_banned_ips 列出的条目一致），供 state.unban_ip 匹配
         try:
-            ipaddress.ip_address(v)
+            if "/" in v:
+                return str(ipaddress.ip_network(v, strict=False))
+            return str(ipaddress.ip_address(v))
         except ValueError:
-            raise ValueError(f"Invalid IP address: {v!r}")
-        return v
+            raise ValueError(f"Invalid IP address or CIDR: {v!r}")